@@ -26,6 +26,31 @@ _test_failed_incremental: Dict[str, Dict[Tuple[int, ...], str]] = {}
 
 
 # Functions #
+def pytest_addoption(parser):
+    """Adds the option to run the benchmark tests which are skipped by default."""
+    parser.addoption("--benchmark", action="store_true", default=False, help="run the benchmark tests")
+    parser.addoption(
+        "--benchmark-save-baseline",
+        action="store_true",
+        default=False,
+        help="store the scaling of the benchmark tests as the baseline instead of checking against it",
+    )
+
+
+def pytest_configure(config):
+    """Registers the markers used by the tests."""
+    config.addinivalue_line("markers", "benchmark: a benchmark test which only runs with the --benchmark option")
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skips the benchmark tests unless the --benchmark option is given."""
+    if not config.getoption("--benchmark"):
+        skip_benchmark = pytest.mark.skip(reason="needs the --benchmark option to run")
+        for item in items:
+            if "benchmark" in item.keywords:
+                item.add_marker(skip_benchmark)
+
+
 def pytest_runtest_makereport(item, call):
     """Handles reports on incremental test calls which are dependent on the success of previous test calls."""
     if "incremental" in item.keywords:
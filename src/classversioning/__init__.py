@@ -21,5 +21,13 @@ __email__ = __email__
 # Local Packages #
 from baseobjects.versioning import *
 from .meta import *
+from .caches import *
+from .detectors import *
+from .instrumentation import *
+from .lazyversioneditem import LazyVersionedItem
+from .sharedversionindex import SharedVersionIndex
+from .versionregistryentry import VersionRegistryEntry
+from .sharedversionregistryentry import SharedVersionRegistryEntry
 from .versionregistry import VersionRegistry
+from .overlayversionregistry import OverlayVersionRegistry
 from .versionedclass import VersionedClass
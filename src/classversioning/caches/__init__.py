@@ -0,0 +1,19 @@
+"""__init__.py
+Caches used to speed up the lookups of versioned classes.
+"""
+# Package Header #
+from ..header import *
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Local Packages #
+from .lrucache import CacheInfo, LRUCache
+from .dispatchcache import DispatchCache
+from .fileversioncache import FileVersionCache
+from .versioninterncache import VersionInternCache, version_intern_cache
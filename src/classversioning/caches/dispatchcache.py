@@ -0,0 +1,126 @@
+"""dispatchcache.py
+A least recently used cache of the versioned classes resolved from version keys.
+"""
+# Package Header #
+from ..header import *
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+from collections.abc import Hashable
+from typing import Any
+
+# Third-Party Packages #
+from baseobjects.versioning import Version
+
+# Local Packages #
+from .lrucache import SENTINEL, LRUCache
+
+
+# Definitions #
+# Classes #
+class DispatchCache(LRUCache):
+    """A least recently used cache of the versioned classes resolved from version keys.
+
+    The cache keys are tuples of the type name, the raw version key, and if the lookup was exact. Each version type has
+    a generation which is stored with its cached items, invalidating a type increments its generation, so all the items
+    cached before the invalidation become misses without having to search the cache for them.
+
+    Attributes:
+        generations: The current generation of each version type.
+    """
+
+    # Magic Methods
+    # Construction/Destruction
+    def __init__(self, maxsize: int = 256) -> None:
+        # New Attributes #
+        self.generations: dict[str, int] = {}
+
+        # Parent Attributes #
+        super().__init__(maxsize=maxsize)
+
+    # Static Methods
+    @staticmethod
+    def create_key(name: str, key: Any, exact: bool = False) -> tuple[str, Any, bool] | None:
+        """Creates a hashable cache key from a lookup.
+
+        Args:
+            name: The name of the version type.
+            key: The raw version key of the lookup.
+            exact: Determines whether the lookup is exact.
+
+        Returns:
+            The cache key or None if the raw version key cannot be hashed.
+        """
+        if isinstance(key, Version):
+            key = (type(key), key.tuple())
+        elif isinstance(key, list):
+            key = tuple(key)
+        elif not isinstance(key, Hashable):
+            return None
+        return name, key, exact
+
+    # Instance Methods
+    def get(self, key: tuple[str, Any, bool], default: Any = None) -> Any:
+        """Gets a resolved class from the cache if it was cached in the current generation of its type.
+
+        Args:
+            key: The cache key of the lookup.
+            default: The value to return if the key is not in the cache.
+
+        Returns:
+            The resolved class or the default value.
+        """
+        item = super().get(key, SENTINEL)
+        if item is SENTINEL:
+            return default
+
+        generation, value = item
+        if generation != self.generations.get(key[0], 0):
+            self.hits -= 1
+            self.misses += 1
+            self.pop(key)
+            return default
+        return value
+
+    def set(self, key: tuple[str, Any, bool], value: Any, generation: int | None = None) -> None:
+        """Caches a resolved class under a generation of its type.
+
+        Args:
+            key: The cache key of the lookup.
+            value: The resolved class.
+            generation: The generation the class was resolved in, defaults to the current generation.
+        """
+        if generation is None:
+            generation = self.generations.get(key[0], 0)
+        super().set(key, (generation, value))
+
+    def get_generation(self, name: str) -> int:
+        """Gets the current generation of a version type.
+
+        Args:
+            name: The name of the version type.
+
+        Returns:
+            The current generation of the version type.
+        """
+        return self.generations.get(name, 0)
+
+    def invalidate(self, name: str | None = None) -> None:
+        """Invalidates all the cached items of a version type.
+
+        Args:
+            name: The name of the version type to invalidate, None invalidates all types.
+        """
+        if name is None:
+            for type_name in self.generations:
+                self.generations[type_name] += 1
+            self.data.clear()
+        else:
+            self.generations[name] = self.generations.get(name, 0) + 1
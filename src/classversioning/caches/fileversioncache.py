@@ -0,0 +1,93 @@
+"""fileversioncache.py
+A least recently used cache of the versions detected from files which is keyed by the identity of the files.
+"""
+# Package Header #
+from ..header import *
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+from collections.abc import Callable
+import os
+from typing import Any
+
+# Third-Party Packages #
+
+# Local Packages #
+from .lrucache import SENTINEL, LRUCache
+
+
+# Definitions #
+# Classes #
+class FileVersionCache(LRUCache):
+    """A least recently used cache of the versions detected from files which is keyed by the identity of the files.
+
+    The items are keyed by the absolute path of the file and store the modification time and size of the file when its
+    version was detected. A file which has changed since then is treated as a miss and its version is detected again.
+    Objects which are not paths to existing files are not cached.
+    """
+
+    # Static Methods
+    @staticmethod
+    def get_identity(obj: Any) -> tuple[str, tuple[int, int]] | None:
+        """Gets the path and stamp which identify the state of a file.
+
+        Args:
+            obj: The object to get the identity of.
+
+        Returns:
+            The absolute path and the modification time and size of the file, or None if the object is not a file.
+        """
+        if not isinstance(obj, (str, os.PathLike)):
+            return None
+
+        path = os.path.abspath(obj)
+        try:
+            stat = os.stat(path)
+        except (OSError, ValueError):
+            return None
+        return path, (stat.st_mtime_ns, stat.st_size)
+
+    # Instance Methods
+    def get_version(self, obj: Any, detect: Callable[[Any], Any]) -> Any:
+        """Gets the version of an object from the cache or detects and caches it if the file is new or has changed.
+
+        Args:
+            obj: The object to get the version of.
+            detect: The function which detects the version of the object.
+
+        Returns:
+            The version of the object.
+        """
+        identity = self.get_identity(obj)
+        if identity is None:
+            return detect(obj)
+
+        path, stamp = identity
+        item = self.get(path, SENTINEL)
+        if item is not SENTINEL:
+            if item[0] == stamp:
+                return item[1]
+            self.hits -= 1
+            self.misses += 1
+
+        version = detect(obj)
+        self.set(path, (stamp, version))
+        return version
+
+    def invalidate(self, path: str | os.PathLike | None = None) -> None:
+        """Removes the cached version of a file.
+
+        Args:
+            path: The path of the file to remove, None removes all files.
+        """
+        if path is None:
+            self.data.clear()
+        else:
+            self.pop(os.path.abspath(path))
@@ -0,0 +1,156 @@
+"""lrucache.py
+A bounded mapping which evicts the least recently used items and keeps hit and miss statistics.
+"""
+# Package Header #
+from ..header import *
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+from collections import OrderedDict
+from typing import Any, NamedTuple
+
+# Third-Party Packages #
+
+# Local Packages #
+
+
+# Definitions #
+SENTINEL = object()
+
+
+# Classes #
+class CacheInfo(NamedTuple):
+    """The statistics of a cache.
+
+    Attributes:
+        hits: The number of lookups which found an item.
+        misses: The number of lookups which did not find an item.
+        maxsize: The maximum number of items the cache can hold.
+        currsize: The number of items in the cache.
+    """
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class LRUCache:
+    """A bounded mapping which evicts the least recently used items and keeps hit and miss statistics.
+
+    The cache can be used from multiple threads, but the statistics are approximate when it is.
+
+    Attributes:
+        maxsize: The maximum number of items the cache can hold, a size of zero disables the cache.
+        data: The items of the cache in order of use.
+        hits: The number of lookups which found an item.
+        misses: The number of lookups which did not find an item.
+
+    Args:
+        maxsize: The maximum number of items the cache can hold, a size of zero disables the cache.
+    """
+
+    # Magic Methods
+    # Construction/Destruction
+    def __init__(self, maxsize: int = 128) -> None:
+        # New Attributes #
+        self.maxsize: int = maxsize
+        self.data: OrderedDict[Any, Any] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    # Container Methods
+    def __len__(self) -> int:
+        """Gets the number of items in the cache.
+
+        Returns:
+            The number of items in the cache.
+        """
+        return len(self.data)
+
+    def __contains__(self, key: Any) -> bool:
+        """Checks if a key is in the cache without affecting the order or statistics.
+
+        Args:
+            key: The key to check for.
+
+        Returns:
+            True if the key is in the cache.
+        """
+        return key in self.data
+
+    # Instance Methods
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Gets an item from the cache and marks it as the most recently used.
+
+        Args:
+            key: The key of the item to get.
+            default: The value to return if the key is not in the cache.
+
+        Returns:
+            The item or the default value.
+        """
+        value = self.data.get(key, SENTINEL)
+        if value is SENTINEL:
+            self.misses += 1
+            return default
+
+        try:
+            self.data.move_to_end(key)
+        except KeyError:
+            pass
+        self.hits += 1
+        return value
+
+    def set(self, key: Any, value: Any) -> None:
+        """Sets an item in the cache and evicts the least recently used items if the cache is full.
+
+        Args:
+            key: The key of the item to set.
+            value: The item to set.
+        """
+        if self.maxsize <= 0:
+            return
+
+        self.data[key] = value
+        try:
+            self.data.move_to_end(key)
+        except KeyError:
+            pass
+        while len(self.data) > self.maxsize:
+            try:
+                self.data.popitem(last=False)
+            except KeyError:
+                break
+
+    def pop(self, key: Any, default: Any = None) -> Any:
+        """Removes an item from the cache.
+
+        Args:
+            key: The key of the item to remove.
+            default: The value to return if the key is not in the cache.
+
+        Returns:
+            The removed item or the default value.
+        """
+        return self.data.pop(key, default)
+
+    def clear(self) -> None:
+        """Removes all items from the cache and resets the statistics."""
+        self.data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> CacheInfo:
+        """Gets the statistics of the cache.
+
+        Returns:
+            The statistics of the cache.
+        """
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self.data))
@@ -0,0 +1,87 @@
+"""versioninterncache.py
+A least recently used cache which interns the versions cast from raw version keys, so equal keys share one version.
+"""
+# Package Header #
+from ..header import *
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+from typing import Any
+
+# Third-Party Packages #
+from baseobjects.versioning import Version, VersionType
+
+# Local Packages #
+from .lrucache import SENTINEL, LRUCache
+
+
+# Definitions #
+# Classes #
+class VersionInternCache(LRUCache):
+    """A least recently used cache which interns the versions cast from raw version keys.
+
+    Versions are interned for each version type, because a version holds the type it belongs to, so each type gets its
+    own version objects. The interned versions are shared, so they must not be changed.
+
+    Args:
+        maxsize: The maximum number of versions the cache can hold, a size of zero disables interning.
+    """
+
+    # Magic Methods
+    # Construction/Destruction
+    def __init__(self, maxsize: int = 4096) -> None:
+        # Parent Attributes #
+        super().__init__(maxsize=maxsize)
+
+    # Instance Methods
+    def get_version(self, version_type: VersionType, key: Any) -> Version:
+        """Gets the interned version of a raw version key, casting and interning it if it is not in the cache.
+
+        The identity of the version type is used in the cache key, because version types compare equal by name. Lists
+        are interned as tuples and keys which cannot be hashed are cast without interning.
+
+        Args:
+            version_type: The version type to cast the version for.
+            key: The raw version key, versions of the type's version class are returned as they are.
+
+        Returns:
+            The version of the raw version key.
+
+        Raises:
+            TypeError: If the raw version key cannot be cast to the version class of the type.
+        """
+        # Raw keys are looked up before anything else, since that is the common case.
+        if isinstance(key, list):
+            cache_key = (id(version_type), tuple, tuple(key))
+        else:
+            cache_key = (id(version_type), type(key), key)
+        try:
+            version = self.get(cache_key, SENTINEL)
+        except TypeError:
+            cache_key = None
+            version = SENTINEL
+
+        # The identity of a collected version type can be reused, so the type of the version is checked too.
+        if version is not SENTINEL and version.version_type is version_type:
+            return version
+        elif isinstance(key, Version):
+            if isinstance(key, version_type.class_):
+                return key
+            cache_key = None  # Versions of other classes are cast without interning, since they are not raw keys.
+
+        version = version_type.class_.cast(key)
+        version.version_type = version_type
+        if cache_key is not None:
+            self.set(cache_key, version)
+        return version
+
+
+# Instances #
+version_intern_cache: VersionInternCache = VersionInternCache()
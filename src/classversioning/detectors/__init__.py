@@ -0,0 +1,18 @@
+"""__init__.py
+Detectors which get versions from the headers of files and buffers.
+"""
+# Package Header #
+from ..header import *
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Local Packages #
+from .versiondetector import VersionDetector
+from .structversiondetector import StructVersionDetector
+from .versiondetectorspec import CompiledVersionDetector, VersionDetectorSpec
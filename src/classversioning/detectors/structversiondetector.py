@@ -0,0 +1,87 @@
+"""structversiondetector.py
+A detector which reads a version packed at an offset of a file with a struct format.
+"""
+# Package Header #
+from ..header import *
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+import struct
+from typing import Any
+
+# Third-Party Packages #
+
+# Local Packages #
+from .versiondetector import VersionDetector
+
+
+# Definitions #
+# Classes #
+class StructVersionDetector(VersionDetector):
+    """A detector which reads a version packed at an offset of a file with a struct format.
+
+    Attributes:
+        offset: The offset in bytes of the version from the start of the file.
+        struct: The precompiled struct which unpacks the version.
+
+    Args:
+        format_: The struct format of the version, the unpacked values make up the version.
+        offset: The offset in bytes of the version from the start of the file.
+        init: Determines if this object will construct.
+    """
+
+    # Magic Methods
+    # Construction/Destruction
+    def __init__(self, format_: str | None = None, offset: int = 0, init: bool = True) -> None:
+        # New Attributes #
+        self.offset: int = 0
+        self.struct: struct.Struct | None = None
+
+        # Parent Attributes #
+        super().__init__(init=False)
+
+        # Object Construction #
+        if init:
+            self.construct(format_=format_, offset=offset)
+
+    # Instance Methods
+    # Constructors/Destructors
+    def construct(self, format_: str | None = None, offset: int | None = None) -> None:
+        """Constructs this object.
+
+        Args:
+            format_: The struct format of the version, the unpacked values make up the version.
+            offset: The offset in bytes of the version from the start of the file.
+        """
+        if format_ is not None:
+            self.struct = struct.Struct(format_)
+
+        if offset is not None:
+            self.offset = offset
+
+        if self.struct is not None:
+            self.header_size = self.offset + self.struct.size
+
+    def read_version(self, view: memoryview) -> tuple[Any, ...]:
+        """Unpacks the version from a view of the header.
+
+        Args:
+            view: The view of the file or buffer.
+
+        Returns:
+            The unpacked values of the version.
+
+        Raises:
+            ValueError: If the view is too short to contain the version.
+        """
+        try:
+            return self.struct.unpack_from(view, self.offset)
+        except struct.error as e:
+            raise ValueError(f"Cannot read the version at offset {self.offset}: {e}") from e
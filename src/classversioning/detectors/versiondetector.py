@@ -0,0 +1,120 @@
+"""versiondetector.py
+An abstract class for detectors which get the version of a file from its header without allocating a buffer for each
+file, either by reading the header into a reused buffer or through a memory map.
+"""
+# Package Header #
+from ..header import *
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+from abc import abstractmethod
+import mmap
+import os
+import threading
+from typing import Any
+
+# Third-Party Packages #
+from baseobjects import BaseObject
+
+# Local Packages #
+
+
+# Definitions #
+# Classes #
+class VersionDetector(BaseObject):
+    """An abstract class for detectors which get the version of a file from its header without allocating buffers.
+
+    A detector can be called with a path, an open binary file, or a bytes-like object. When the size of the header is
+    known, the header is read into a buffer which each thread reuses, otherwise the file is memory mapped. Either way,
+    the version is read from a memoryview, so nothing is allocated or copied for each file.
+
+    Class Attributes:
+        header_size: The number of bytes at the start of a file the version is in, None if it is not known.
+    """
+    header_size: int | None = None
+    _buffers: threading.local = threading.local()
+
+    # Magic Methods
+    # Callable
+    def __call__(self, obj: Any) -> Any:
+        """Gets the version of a file or buffer.
+
+        Args:
+            obj: The path, open binary file, or bytes-like object to get the version of.
+
+        Returns:
+            The version of the file or buffer.
+        """
+        return self.detect(obj)
+
+    # Instance Methods
+    def detect(self, obj: Any) -> Any:
+        """Gets the version of a file or buffer.
+
+        Args:
+            obj: The path, open binary file, or bytes-like object to get the version of.
+
+        Returns:
+            The version of the file or buffer.
+        """
+        if isinstance(obj, (bytes, bytearray, memoryview)):
+            with memoryview(obj) as view:
+                return self.read_version(view)
+        elif isinstance(obj, (str, os.PathLike)):
+            with open(obj, "rb", buffering=0) as file:
+                return self.detect_file(file)
+        else:
+            return self.detect_file(obj)
+
+    def detect_file(self, file: Any) -> Any:
+        """Gets the version of an open binary file by reading its header into a reused buffer or memory mapping it.
+
+        The header is always read from the start of the file, and the position of the file is not changed.
+
+        Args:
+            file: The open binary file to get the version of.
+
+        Returns:
+            The version of the file.
+        """
+        if self.header_size is not None:
+            buffer = getattr(self._buffers, "buffer", None)
+            if buffer is None or len(buffer) < self.header_size:
+                self._buffers.buffer = buffer = bytearray(self.header_size)
+            # The header is read from the start of the file and the position of the file is left unchanged.
+            position = file.tell()
+            try:
+                file.seek(0)
+                with memoryview(buffer) as buffer_view:
+                    size = file.readinto(buffer_view[: self.header_size])
+                    with buffer_view[:size] as view:
+                        return self.read_version(view)
+            finally:
+                file.seek(position)
+
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty files cannot be mapped.
+            return self.read_version(memoryview(b""))
+
+        with mapped, memoryview(mapped) as view:
+            return self.read_version(view)
+
+    @abstractmethod
+    def read_version(self, view: memoryview) -> Any:
+        """Reads the version from a view of the header, the view must not be kept after returning.
+
+        Args:
+            view: The view of the file or buffer.
+
+        Returns:
+            The version read from the view.
+        """
+        pass
@@ -0,0 +1,259 @@
+"""versiondetectorspec.py
+A declarative description of where and how the version of a file is stored which compiles into a fast detector.
+"""
+# Package Header #
+from ..header import *
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+from collections.abc import Callable
+import re
+import struct
+from typing import Any
+
+# Third-Party Packages #
+from baseobjects import BaseObject
+
+# Local Packages #
+from .versiondetector import VersionDetector
+
+
+# Definitions #
+# Classes #
+class CompiledVersionDetector(VersionDetector):
+    """A detector which reads the version with a reader function compiled from a VersionDetectorSpec.
+
+    Attributes:
+        spec: The specification this detector was compiled from.
+        reader: The compiled function which reads the version from a view of the header.
+
+    Args:
+        spec: The specification this detector was compiled from.
+        reader: The compiled function which reads the version from a view of the header.
+    """
+
+    # Magic Methods
+    # Construction/Destruction
+    def __init__(self, spec: "VersionDetectorSpec", reader: Callable[[memoryview], Any]) -> None:
+        # New Attributes #
+        self.spec: VersionDetectorSpec = spec
+        self.reader: Callable[[memoryview], Any] = reader
+
+        # Parent Attributes #
+        super().__init__()
+
+    # Instance Methods
+    def read_version(self, view: memoryview) -> Any:
+        """Reads the version from a view of the header with the compiled reader.
+
+        Args:
+            view: The view of the file or buffer.
+
+        Returns:
+            The version read from the view.
+        """
+        return self.reader(view)
+
+
+class VersionDetectorSpec(BaseObject):
+    """A declarative description of where and how the version of a file is stored.
+
+    The version is either packed at an offset with a struct format or matched by a regular expression within a window
+    of the header, and the header can be checked for magic bytes first. Compiling the specification precompiles the
+    struct or regular expression and builds a reader function with only the steps the specification needs.
+
+    Attributes:
+        magic: The bytes the header must have at the magic offset, None does not check.
+        magic_offset: The offset in bytes of the magic bytes.
+        format_: The struct format of the version, the unpacked values make up the version.
+        offset: The offset in bytes of the packed version.
+        pattern: The regular expression which matches the version, its groups make up the version.
+        window: The number of bytes from the start of the header to search with the pattern, None searches it all.
+        transform: A function which converts the read values into the version.
+
+    Args:
+        magic: The bytes the header must have at the magic offset, None does not check.
+        magic_offset: The offset in bytes of the magic bytes.
+        format_: The struct format of the version, the unpacked values make up the version.
+        offset: The offset in bytes of the packed version.
+        pattern: The regular expression which matches the version, its groups make up the version.
+        window: The number of bytes from the start of the header to search with the pattern, None searches it all.
+        transform: A function which converts the read values into the version.
+        init: Determines if this object will construct.
+    """
+    magic: bytes | None = None
+    magic_offset: int = 0
+    format_: str | None = None
+    offset: int = 0
+    pattern: bytes | str | None = None
+    window: int | None = None
+    transform: Callable[[Any], Any] | None = None
+
+    # Magic Methods
+    # Construction/Destruction
+    def __init__(
+        self,
+        magic: bytes | None = None,
+        magic_offset: int | None = None,
+        format_: str | None = None,
+        offset: int | None = None,
+        pattern: bytes | str | None = None,
+        window: int | None = None,
+        transform: Callable[[Any], Any] | None = None,
+        init: bool = True,
+    ) -> None:
+        # Parent Attributes #
+        super().__init__()
+
+        # Object Construction #
+        if init:
+            self.construct(
+                magic=magic,
+                magic_offset=magic_offset,
+                format_=format_,
+                offset=offset,
+                pattern=pattern,
+                window=window,
+                transform=transform,
+            )
+
+    # Instance Methods
+    # Constructors/Destructors
+    def construct(
+        self,
+        magic: bytes | None = None,
+        magic_offset: int | None = None,
+        format_: str | None = None,
+        offset: int | None = None,
+        pattern: bytes | str | None = None,
+        window: int | None = None,
+        transform: Callable[[Any], Any] | None = None,
+    ) -> None:
+        """Constructs this object.
+
+        Args:
+            magic: The bytes the header must have at the magic offset, None does not check.
+            magic_offset: The offset in bytes of the magic bytes.
+            format_: The struct format of the version, the unpacked values make up the version.
+            offset: The offset in bytes of the packed version.
+            pattern: The regular expression which matches the version, its groups make up the version.
+            window: The number of bytes from the start of the header to search with the pattern.
+            transform: A function which converts the read values into the version.
+
+        Raises:
+            ValueError: If both or neither a struct format and pattern are given.
+        """
+        if magic is not None:
+            self.magic = magic
+        if magic_offset is not None:
+            self.magic_offset = magic_offset
+        if format_ is not None:
+            self.format_ = format_
+        if offset is not None:
+            self.offset = offset
+        if pattern is not None:
+            self.pattern = pattern
+        if window is not None:
+            self.window = window
+        if transform is not None:
+            self.transform = transform
+
+        if (self.format_ is None) == (self.pattern is None):
+            raise ValueError("A version detector needs either a struct format or a pattern.")
+
+    def compile(self) -> CompiledVersionDetector:
+        """Compiles this specification into a detector.
+
+        Returns:
+            The detector which reads the version as this specification describes.
+        """
+        reader = self._compile_struct() if self.format_ is not None else self._compile_pattern()
+
+        if self.transform is not None:
+            transform = self.transform
+            read_values = reader
+
+            def reader(view: memoryview) -> Any:
+                return transform(read_values(view))
+
+        if self.magic is not None:
+            magic = self.magic
+            start = self.magic_offset
+            stop = start + len(magic)
+            read_version = reader
+
+            def reader(view: memoryview) -> Any:
+                if view[start:stop] != magic:
+                    raise ValueError(f"The header does not start with the magic bytes {magic!r}.")
+                return read_version(view)
+
+        detector = CompiledVersionDetector(self, reader)
+        detector.header_size = self.get_header_size()
+        return detector
+
+    def get_header_size(self) -> int | None:
+        """Gets the number of bytes at the start of a file which contain the magic bytes and version.
+
+        Returns:
+            The size of the header or None if the whole file may need to be searched.
+        """
+        if self.format_ is not None:
+            size = self.offset + struct.calcsize(self.format_)
+        elif self.window is not None:
+            size = self.window
+        else:
+            return None
+
+        if self.magic is not None:
+            size = max(size, self.magic_offset + len(self.magic))
+        return size
+
+    def _compile_struct(self) -> Callable[[memoryview], Any]:
+        """Compiles the reader of a version packed with a struct format.
+
+        Returns:
+            The function which unpacks the version from a view of the header.
+        """
+        unpack_from = struct.Struct(self.format_).unpack_from
+        offset = self.offset
+
+        def reader(view: memoryview) -> tuple[Any, ...]:
+            try:
+                return unpack_from(view, offset)
+            except struct.error as e:
+                raise ValueError(f"Cannot read the version at offset {offset}: {e}") from e
+
+        return reader
+
+    def _compile_pattern(self) -> Callable[[memoryview], Any]:
+        """Compiles the reader of a version matched by a regular expression.
+
+        Returns:
+            The function which matches the version in a view of the header.
+        """
+        pattern = self.pattern.encode() if isinstance(self.pattern, str) else self.pattern
+        search = re.compile(pattern).search
+        window = self.window
+
+        def reader(view: memoryview) -> tuple[int, ...] | str:
+            match = search(view, 0, len(view) if window is None else window)
+            if match is None:
+                raise ValueError(f"The header does not contain a version matching {pattern!r}.")
+
+            # Optional groups which did not take part in the match are None, so they are not part of the version.
+            groups = tuple(group for group in match.groups() if group is not None) if match.re.groups else (match.group(),)
+            if not groups:
+                raise ValueError(f"The header does not contain a version matching {pattern!r}.")
+            elif all(group.isdigit() for group in groups):
+                return tuple(int(group) for group in groups)
+            else:
+                return b".".join(groups).decode()
+
+        return reader
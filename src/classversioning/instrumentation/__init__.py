@@ -0,0 +1,17 @@
+"""__init__.py
+Opt-in instrumentation of the dispatch path which counts events and times the phases of dispatching.
+"""
+# Package Header #
+from ..header import *
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Local Packages #
+from .timinghistogram import TimingHistogram
+from .dispatchinstrumentation import DispatchInstrumentation
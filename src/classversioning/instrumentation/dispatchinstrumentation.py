@@ -0,0 +1,148 @@
+"""dispatchinstrumentation.py
+Counts the events and times the phases of dispatching versioned classes for each version type.
+"""
+# Package Header #
+from ..header import *
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+from collections.abc import Callable, Iterable
+import threading
+from time import perf_counter_ns
+from typing import Any
+
+# Third-Party Packages #
+
+# Local Packages #
+from .timinghistogram import TimingHistogram
+
+
+# Definitions #
+# Classes #
+class DispatchInstrumentation:
+    """Counts the events and times the phases of dispatching versioned classes for each version type.
+
+    Instrumentation is enabled on a registry, which the registry and the versioned classes using it check before each
+    lookup or dispatch, so it costs a single attribute check when it is disabled. The phases which are timed are:
+        detect: Getting the version from the object being dispatched.
+        cast: Casting the version key into a sort key.
+        search: Searching the registry for the versioned object.
+        construct: Creating the object of the dispatched class in VersionedClass.__new__. Without single construction
+            this calls the dispatched class, so its initialization is included. Python initializes the object after
+            __new__ returns, and that initialization is never included.
+        dispatch: The whole of VersionedClass.__new__ for a version head, which is detect, the lookup, and construct.
+
+    The events which are counted are dispatch, not_found, lookup, cache_hit, and cache_miss. Callbacks are called with
+    the name of the version type, the phase, and the duration in nanoseconds each time a phase is timed.
+
+    Attributes:
+        counters: The counts of the events of each version type.
+        timings: The histograms of the durations of the phases of each version type.
+        callbacks: The functions which are called with each timing.
+        _lock: The lock which serializes the updates to the counters and histograms.
+
+    Args:
+        callbacks: The functions which are called with each timing.
+    """
+
+    # Magic Methods
+    # Construction/Destruction
+    def __init__(self, callbacks: Iterable[Callable[[str, str, int], Any]] = ()) -> None:
+        # New Attributes #
+        self.counters: dict[str, dict[str, int]] = {}
+        self.timings: dict[str, dict[str, TimingHistogram]] = {}
+        self.callbacks: list[Callable[[str, str, int], Any]] = list(callbacks)
+        self._lock: threading.Lock = threading.Lock()
+
+    # Instance Methods
+    def add_callback(self, callback: Callable[[str, str, int], Any]) -> None:
+        """Adds a function which is called with the version type name, the phase, and the duration of each timing.
+
+        Args:
+            callback: The function to add.
+        """
+        self.callbacks.append(callback)
+
+    def remove_callback(self, callback: Callable[[str, str, int], Any]) -> None:
+        """Removes a function which is called with each timing.
+
+        Args:
+            callback: The function to remove.
+        """
+        self.callbacks.remove(callback)
+
+    def count(self, name: str, event: str, number: int = 1) -> None:
+        """Counts an event of a version type.
+
+        Args:
+            name: The name of the version type.
+            event: The name of the event.
+            number: The number of events to count.
+        """
+        with self._lock:
+            counters = self.counters.setdefault(name, {})
+            counters[event] = counters.get(event, 0) + number
+
+    def record(self, name: str, phase: str, duration: int) -> None:
+        """Records the duration of a phase of a version type and calls the callbacks with it.
+
+        Args:
+            name: The name of the version type.
+            phase: The name of the phase.
+            duration: The duration of the phase in nanoseconds.
+        """
+        with self._lock:
+            histogram = self.timings.setdefault(name, {}).get(phase, None)
+            if histogram is None:
+                self.timings[name][phase] = histogram = TimingHistogram()
+            histogram.record(duration)
+
+        for callback in self.callbacks:
+            callback(name, phase, duration)
+
+    def measure(self, name: str, phase: str, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Calls a function and records its duration as a phase of a version type, even if it raises an error.
+
+        Args:
+            name: The name of the version type.
+            phase: The name of the phase.
+            func: The function to call.
+            *args: The arguments for the function.
+            **kwargs: The keyword arguments for the function.
+
+        Returns:
+            The result of the function.
+        """
+        start = perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.record(name, phase, perf_counter_ns() - start)
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Gets a copy of the counters and the summaries of the histograms of each version type.
+
+        Returns:
+            The counters and timing summaries by version type name.
+        """
+        with self._lock:
+            return {
+                name: {
+                    "counters": dict(self.counters.get(name, {})),
+                    "timings": {phase: h.summary() for phase, h in self.timings.get(name, {}).items()},
+                }
+                for name in self.counters.keys() | self.timings.keys()
+            }
+
+    def reset(self) -> None:
+        """Removes all the counts and timings."""
+        with self._lock:
+            self.counters.clear()
+            self.timings.clear()
@@ -0,0 +1,106 @@
+"""timinghistogram.py
+A histogram of durations with power of two buckets, so recording a duration is a constant time operation.
+"""
+# Package Header #
+from ..header import *
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+from typing import Any
+
+# Third-Party Packages #
+
+# Local Packages #
+
+
+# Definitions #
+# Classes #
+class TimingHistogram:
+    """A histogram of durations in nanoseconds with power of two buckets.
+
+    A duration is counted in the bucket of its bit length, so bucket n holds the durations from 2 ** (n - 1) up to
+    2 ** n nanoseconds. Percentiles are estimated as the upper bound of the bucket they fall in.
+
+    Attributes:
+        buckets: The number of durations in each bucket.
+        count: The number of durations recorded.
+        total: The sum of the durations recorded.
+        minimum: The shortest duration recorded.
+        maximum: The longest duration recorded.
+    """
+
+    # Magic Methods
+    # Construction/Destruction
+    def __init__(self) -> None:
+        # New Attributes #
+        self.buckets: list[int] = [0] * 64
+        self.count: int = 0
+        self.total: int = 0
+        self.minimum: int | None = None
+        self.maximum: int | None = None
+
+    # Instance Methods
+    def record(self, duration: int) -> None:
+        """Records a duration in the histogram.
+
+        Args:
+            duration: The duration in nanoseconds.
+        """
+        self.buckets[min(max(duration, 0).bit_length(), 63)] += 1
+        self.count += 1
+        self.total += duration
+        if self.minimum is None or duration < self.minimum:
+            self.minimum = duration
+        if self.maximum is None or duration > self.maximum:
+            self.maximum = duration
+
+    def mean(self) -> float:
+        """Gets the mean of the recorded durations.
+
+        Returns:
+            The mean duration in nanoseconds or zero if nothing was recorded.
+        """
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent: float) -> int:
+        """Estimates a percentile of the recorded durations.
+
+        Args:
+            percent: The percentile to estimate, from 0 to 100.
+
+        Returns:
+            The upper bound of the bucket the percentile falls in, in nanoseconds, or zero if nothing was recorded.
+        """
+        if not self.count:
+            return 0
+
+        target = self.count * percent / 100
+        running = 0
+        for bit_length, number in enumerate(self.buckets):
+            running += number
+            if number and running >= target:
+                return min((1 << bit_length) - 1, self.maximum)
+        return self.maximum
+
+    def summary(self) -> dict[str, Any]:
+        """Gets the statistics of the histogram.
+
+        Returns:
+            The count, total, minimum, maximum, mean, and estimated median and 99th percentile of the durations.
+        """
+        return {
+            "count": self.count,
+            "total": self.total,
+            "minimum": self.minimum,
+            "maximum": self.maximum,
+            "mean": self.mean(),
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+        }
@@ -0,0 +1,100 @@
+"""lazyversioneditem.py
+A placeholder for a versioned class which is registered by its version and import path, so the class is only imported
+when a lookup selects it.
+"""
+# Package Header #
+from .header import *
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+import importlib
+from typing import Any
+
+# Third-Party Packages #
+from baseobjects import BaseObject
+from baseobjects.versioning import Version, VersionType
+
+# Local Packages #
+from .caches import version_intern_cache
+
+
+# Definitions #
+# Classes #
+class LazyVersionedItem(BaseObject):
+    """A placeholder for a versioned class which is registered by its version and import path.
+
+    The registry sorts and searches the placeholder like the class it stands for and imports the class when a lookup
+    selects it. Importing the class registers it which replaces the placeholder.
+
+    Attributes:
+        VERSION: The version of the class.
+        _VERSION_KEY: The sort key of the version.
+        version_type: The type of version of the class.
+        path: The import path of the class, either "module:qualname" or "module.name".
+
+    Args:
+        version_type: The type of version of the class.
+        version: The version of the class.
+        path: The import path of the class, either "module:qualname" or "module.name".
+    """
+
+    # Magic Methods
+    # Construction/Destruction
+    def __init__(self, version_type: VersionType, version: Version | str | tuple, path: str) -> None:
+        # New Attributes #
+        self.version_type: VersionType = version_type
+        self.VERSION: Version = version if isinstance(version, Version) else version_intern_cache.get_version(
+            version_type,
+            version,
+        )
+        self._VERSION_KEY: tuple = self.VERSION.tuple()
+        self.path: str = path
+
+        # Parent Attributes #
+        super().__init__()
+
+    # Representation
+    def __repr__(self) -> str:
+        """Gets the representation of this placeholder.
+
+        Returns:
+            The representation of this placeholder.
+        """
+        return f"<{self.__class__.__name__} {self.version_type.name} {self.VERSION} {self.path}>"
+
+    # Static Methods
+    @staticmethod
+    def import_object(path: str) -> Any:
+        """Imports an object by its import path.
+
+        Args:
+            path: The import path of the object, either "module:qualname" or "module.name".
+
+        Returns:
+            The imported object.
+        """
+        if ":" in path:
+            module_name, _, qualname = path.partition(":")
+        else:
+            module_name, _, qualname = path.rpartition(".")
+
+        obj = importlib.import_module(module_name)
+        for name in qualname.split("."):
+            obj = getattr(obj, name)
+        return obj
+
+    # Instance Methods
+    def load(self) -> Any:
+        """Imports the class this placeholder stands for.
+
+        Returns:
+            The imported class.
+        """
+        return self.import_object(self.path)
@@ -13,6 +13,6 @@ __email__ = __email__
 
 # Imports #
 # Local Packages #
-from .versionedmeta import VersionedMeta
+from .versionedmeta import VersionedMeta, reduce_versioned_class, restore_versioned_class
 from .versionedinitmeta import VersionedInitMeta
 from .cachingversionedinitmeta import CachingVersionedInitMeta
@@ -13,6 +13,7 @@ __email__ = __email__
 
 # Imports #
 # Standard Libraries #
+import copyreg
 from typing import Any
 
 # Third-Party Packages #
@@ -20,20 +21,76 @@ from baseobjects import BaseMeta
 from baseobjects.versioning import Version
 
 # Local Packages #
+from ..caches import version_intern_cache
 
 
 # Definitions #
+# Functions #
+def restore_versioned_class(head: "VersionedMeta", key: tuple) -> "VersionedMeta":
+    """Gets a versioned class from the registry of its version head, which is how pickled versioned classes are loaded.
+
+    Args:
+        head: The version head of the class.
+        key: The sort key of the version of the class.
+
+    Returns:
+        The versioned class.
+    """
+    return head.get_registry().get_version_cached(head._VERSION_TYPE.name, key, exact=True)
+
+
+def reduce_versioned_class(cls: "VersionedMeta") -> str | tuple[Any, tuple["VersionedMeta", tuple]]:
+    """Reduces a versioned class for pickling to its version head and version key, so it is pickled by its version.
+
+    A class is only reduced to its version when looking up its version gets the class back, so version heads, classes
+    which are not registered, and classes which share a version with another class are pickled by their name.
+
+    Args:
+        cls: The versioned class to reduce.
+
+    Returns:
+        The function and arguments that load the class, or the name of the class to pickle it by.
+    """
+    version_type = cls._VERSION_TYPE
+    head = None if version_type is None else version_type.head_class
+    key = cls._VERSION_KEY
+    if head is not None and head is not cls and key is not None and hasattr(head, "get_registry"):
+        try:
+            if head.get_registry().get_version_cached(version_type.name, key, exact=True) is cls:
+                return restore_versioned_class, (head, key)
+        except (KeyError, ValueError):
+            pass
+    return cls.__qualname__
+
+
 # Classes #
 class VersionedMeta(BaseMeta):
     """A Meta Class that can compare the specified version of the classes.
 
+    The comparisons first check for a class of the same version type which has a precomputed comparison key, the
+    tuple of its version, and compares the keys directly. All other comparisons fall back to comparing the versions,
+    where raw version keys are cast through the version intern cache, so repeated keys do not create new versions.
+
+    Versioned classes are pickled by their version head and version key, so they are loaded from the registry when
+    unpickled and dynamically created classes can be sent to other processes which have registered them. The pickling
+    function is registered for this metaclass and each of its subclasses.
+
     Class Attributes:
         _VERSION_TYPE: The type of version this object will be.
+        _VERSION_KEY: The precomputed comparison key of the version, None if it has not been computed.
         VERSION: The version of this class as a string.
     """
     _VERSION_TYPE: type | None = None
+    _VERSION_KEY: tuple | None = None
     VERSION: Version | None = None
 
+    # Meta Magic Methods
+    # Construction/Destruction
+    def __init_subclass__(mcs, **kwargs: Any) -> None:
+        """Registers the pickling function for the subclasses of this metaclass, since pickle uses the exact type."""
+        super().__init_subclass__(**kwargs)
+        copyreg.pickle(mcs, reduce_versioned_class)
+
     # Magic Methods
     # Representation
     def __hash__(self) -> int:
@@ -57,8 +114,12 @@ class VersionedMeta(BaseMeta):
         Raises:
             TypeError: If 'other' is a type that cannot be compared to.
         """
+        keys = cls._comparison_keys(other)
+        if keys is not None:
+            return keys[0] == keys[1]
+
         if isinstance(other, cls.__class__):
-            if id(cls) == id(object):
+            if cls is other or id(cls) == id(object):
                 return True
             elif cls._VERSION_TYPE != other._VERSION_TYPE:
                 return False
@@ -67,14 +128,14 @@ class VersionedMeta(BaseMeta):
             other_version = other
         elif cls.VERSION is not None:
             try:
-                other_version = cls.VERSION.cast(other)
+                other_version = cls._cast_version(other)
             except TypeError:
                 return super().__eq__(other)
         else:
             return super().__eq__(other)
 
         if isinstance(other_version, type(cls.VERSION)):
-            return cls.VERSION == other_version
+            return other_version is cls.VERSION or cls.VERSION == other_version
         else:
             raise TypeError(f"'==' not supported between instances of '{str(cls)}' and '{str(other)}'")
 
@@ -90,6 +151,12 @@ class VersionedMeta(BaseMeta):
         Raises:
             TypeError: If 'other' is a type that cannot be compared to.
         """
+        if cls is other:
+            return False
+        keys = cls._comparison_keys(other)
+        if keys is not None:
+            return keys[0] != keys[1]
+
         if isinstance(other, cls.__class__):
             if cls._VERSION_TYPE != other._VERSION_TYPE:
                 super().__ne__(other)
@@ -98,14 +165,14 @@ class VersionedMeta(BaseMeta):
             other_version = other
         elif cls.VERSION is not None:
             try:
-                other_version = cls.VERSION.cast(other)
+                other_version = cls._cast_version(other)
             except TypeError:
                 return super().__ne__(other)
         else:
             return super().__ne__(other)
 
         if isinstance(other_version, type(cls.VERSION)):
-            return cls.VERSION != other_version
+            return other_version is not cls.VERSION and cls.VERSION != other_version
         else:
             raise TypeError(f"'!=' not supported between instances of '{str(cls)}' and '{str(other)}'")
 
@@ -121,6 +188,10 @@ class VersionedMeta(BaseMeta):
         Raises:
             TypeError: If 'other' is a type that cannot be compared to.
         """
+        keys = cls._comparison_keys(other)
+        if keys is not None:
+            return keys[0] < keys[1]
+
         if isinstance(other, cls.__class__):
             if cls._VERSION_TYPE != other._VERSION_TYPE:
                 raise TypeError(f"'<' not supported between instances of '{str(cls)}' and '{str(other)}'")
@@ -128,7 +199,7 @@ class VersionedMeta(BaseMeta):
         elif isinstance(other, Version):
             other_version = other
         else:
-            other_version = cls.VERSION.cast(other)
+            other_version = cls._cast_version(other)
 
         if isinstance(other_version, type(cls.VERSION)):
             return cls.VERSION < other_version
@@ -147,6 +218,10 @@ class VersionedMeta(BaseMeta):
         Raises:
             TypeError: If 'other' is a type that cannot be compared to.
         """
+        keys = cls._comparison_keys(other)
+        if keys is not None:
+            return keys[0] > keys[1]
+
         if isinstance(other, cls.__class__):
             if cls._VERSION_TYPE != other._VERSION_TYPE:
                 raise TypeError(f"'>' not supported between instances of '{str(cls)}' and '{str(other)}'")
@@ -154,7 +229,7 @@ class VersionedMeta(BaseMeta):
         elif isinstance(other, Version):
             other_version = other
         else:
-            other_version = cls.VERSION.cast(other)
+            other_version = cls._cast_version(other)
 
         if isinstance(other_version, type(cls.VERSION)):
             return cls.VERSION > other_version
@@ -173,6 +248,10 @@ class VersionedMeta(BaseMeta):
         Raises:
             TypeError: If 'other' is a type that cannot be compared to.
         """
+        keys = cls._comparison_keys(other)
+        if keys is not None:
+            return keys[0] <= keys[1]
+
         if isinstance(other, cls.__class__):
             if cls._VERSION_TYPE != other._VERSION_TYPE:
                 raise TypeError(f"'<=' not supported between instances of '{str(cls)}' and '{str(other)}'")
@@ -180,7 +259,7 @@ class VersionedMeta(BaseMeta):
         elif isinstance(other, Version):
             other_version = other
         else:
-            other_version = cls.VERSION.cast(other)
+            other_version = cls._cast_version(other)
 
         if isinstance(other_version, type(cls.VERSION)):
             return cls.VERSION <= other_version
@@ -199,6 +278,10 @@ class VersionedMeta(BaseMeta):
         Raises:
             TypeError: If 'other' is a type that cannot be compared to.
         """
+        keys = cls._comparison_keys(other)
+        if keys is not None:
+            return keys[0] >= keys[1]
+
         if isinstance(other, cls.__class__):
             if cls._VERSION_TYPE != other._VERSION_TYPE:
                 raise TypeError(f"'>=' not supported between instances of '{str(cls)}' and '{str(other)}'")
@@ -206,9 +289,43 @@ class VersionedMeta(BaseMeta):
         elif isinstance(other, Version):
             other_version = other
         else:
-            other_version = cls.VERSION.cast(other)
+            other_version = cls._cast_version(other)
 
         if isinstance(other_version, type(cls.VERSION)):
             return cls.VERSION >= other_version
         else:
             raise TypeError(f"'>=' not supported between instances of '{str(cls)}' and '{str(other)}'")
+
+    # Instance Methods
+    def _comparison_keys(cls, other: Any) -> tuple[tuple, tuple] | None:
+        """Gets the precomputed comparison keys of this class and another class of the same version type.
+
+        Args:
+            other: The object to compare to this class.
+
+        Returns:
+            The comparison keys of this class and the other class, or None if they cannot be compared by their keys.
+        """
+        if type(other) is type(cls) and other._VERSION_TYPE is cls._VERSION_TYPE:
+            key = cls._VERSION_KEY
+            other_key = other._VERSION_KEY
+            if key is not None and other_key is not None:
+                return key, other_key
+        return None
+
+    def _cast_version(cls, other: Any) -> Version:
+        """Casts a raw version key to the version class of this class, interning it if this class has a version type.
+
+        Args:
+            other: The raw version key to cast.
+
+        Returns:
+            The version of the raw version key.
+        """
+        if cls._VERSION_TYPE is None:
+            return cls.VERSION.cast(other)
+        return version_intern_cache.get_version(cls._VERSION_TYPE, other)
+
+
+# Registration #
+copyreg.pickle(VersionedMeta, reduce_versioned_class)
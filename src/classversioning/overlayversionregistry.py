@@ -0,0 +1,312 @@
+"""overlayversionregistry.py
+OverlayVersionRegistry layers temporary versions over a base VersionRegistry without copying the base. The overlays can
+be scoped to a context, so tests or tenants can add versions which are only seen within that context.
+"""
+# Package Header #
+from .header import *
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+import heapq
+from operator import itemgetter
+from typing import Any
+
+# Third-Party Packages #
+from baseobjects.versioning import VersionType, Version
+
+# Local Packages #
+from .packedkeys import get_numpy, get_unique_keys
+from .versionregistry import SENTINEL, VersionRegistry
+
+
+# Definitions #
+registry_overlays: ContextVar[dict[int, "OverlayVersionRegistry"] | None] = ContextVar(
+    "registry_overlays",
+    default=None,
+)
+
+
+# Functions #
+def get_active_registry(registry: VersionRegistry) -> VersionRegistry:
+    """Gets the innermost overlay of a registry in the current context or the registry if it has no overlay.
+
+    Args:
+        registry: The registry to get the active registry of.
+
+    Returns:
+        The active registry.
+    """
+    overlays = registry_overlays.get()
+    if overlays:
+        return overlays.get(id(registry), registry)
+    return registry
+
+
+@contextmanager
+def overlay_registry(registry: VersionRegistry) -> Iterator["OverlayVersionRegistry"]:
+    """Layers a new overlay over the active registry of a registry for the current context.
+
+    Args:
+        registry: The registry to overlay.
+
+    Yields:
+        The overlay which is active within the context.
+    """
+    overlays = registry_overlays.get() or {}
+    overlay = OverlayVersionRegistry(overlays.get(id(registry), registry))
+    token = registry_overlays.set({**overlays, id(registry): overlay})
+    try:
+        yield overlay
+    finally:
+        registry_overlays.reset(token)
+
+
+# Classes #
+class OverlayVersionRegistry(VersionRegistry):
+    """A registry which layers its own versioned objects over a base registry without copying the base.
+
+    Items added to the overlay are only stored in the overlay. Lookups of types the overlay does not have fall through
+    to the base, including its dispatch cache, and lookups of types both have return the best match of the two, with
+    the overlay winning ties.
+
+    Attributes:
+        base: The registry the overlay is layered over.
+
+    Args:
+        base: The registry the overlay is layered over.
+        **kwargs: The keyword arguments for creating the registry.
+    """
+
+    # Magic Methods
+    # Construction/Destruction
+    def __init__(self, base: VersionRegistry, **kwargs: Any) -> None:
+        # New Attributes #
+        self.base: VersionRegistry = base
+
+        # Parent Attributes #
+        kwargs.setdefault("thread_safe", base.thread_safe)
+        kwargs.setdefault("weak", base.weak)
+        super().__init__(**kwargs)
+        self.instrumentation = base.instrumentation
+
+    # Container Methods
+    def __missing__(self, key: str) -> Any:
+        """Gets the entry of a type from the base when the overlay does not have it.
+
+        Args:
+            key: The name of the type.
+
+        Returns:
+            The entry of the type in the base.
+        """
+        return self.base[key]
+
+    def __contains__(self, key: Any) -> bool:
+        """Checks if the overlay or the base has a type.
+
+        Args:
+            key: The name of the type.
+
+        Returns:
+            True if the overlay or base has the type.
+        """
+        return key in self.data or key in self.base
+
+    # Instance Methods
+    def get_version(
+        self,
+        type_: str | VersionType,
+        key: Version | Iterable[int] | str | int,
+        exact: bool = False,
+    ) -> Any:
+        """Gets an object from the overlay or the base based on the type and version of object.
+
+        Args:
+            type_: The type of versioned object to get.
+            key: The key to search for the versioned object with.
+            exact: Determines whether the exact version is need or return the closest version.
+
+        Returns
+            obj: The versioned object.
+
+        Raises
+            ValueError: If neither the overlay nor the base have a closest or exact version.
+        """
+        if isinstance(type_, VersionType):
+            type_ = type_.name
+
+        if type_ not in self.data:
+            return self.base.get_version(type_, key, exact=exact)
+        elif self.base.get_version_type(type_, None) is None:
+            return super().get_version(type_, key, exact=exact)
+
+        try:
+            item = super().get_version(type_, key, exact=exact)
+        except ValueError as error:
+            try:
+                return self.base.get_version(type_, key, exact=exact)
+            except ValueError:
+                raise error
+
+        return item if exact else self._get_closest_of_base(type_, key, item)
+
+    def _get_closest_of_base(self, type_: str, key: Version | Iterable[int] | str | int, item: Any) -> Any:
+        """Gets the closest object to a version out of an object of the overlay and the closest object of the base.
+
+        Args:
+            type_: The type of versioned object to get.
+            key: The key to search for the versioned object with.
+            item: The closest object of the overlay.
+
+        Returns:
+            The object of the overlay or the base with the latest version which is not after the key.
+        """
+        try:
+            base_item = self.base.get_version(type_, key)
+        except ValueError:
+            return item
+        return base_item if self.get_item_key(base_item) > self.get_item_key(item) else item
+
+    def get_versions(
+        self,
+        type_: str | VersionType,
+        keys: Iterable[Version | Iterable[int] | str] | Any,
+        exact: bool = False,
+        indices: bool = False,
+    ) -> Any:
+        """Gets the objects of many version keys at once from the overlay or the base.
+
+        When both the overlay and the base have the type, each distinct key is looked up with get_version, since there
+        is no single list to search.
+
+        Args:
+            type_: The type of versioned object to get.
+            keys: The version keys as a sequence or array of version strings, tuples, or versions.
+            exact: Determines whether the exact versions are needed or return the closest versions.
+            indices: Determines if the indices of the objects in the type's list are returned instead of the objects.
+
+        Returns:
+            An int array of the indices of the objects or an object array of the versioned objects.
+
+        Raises
+            ValueError: If indices are requested for a type in both the overlay and the base.
+        """
+        if isinstance(type_, VersionType):
+            type_ = type_.name
+
+        if type_ not in self.data:
+            return self.base.get_versions(type_, keys, exact=exact, indices=indices)
+        elif self.base.get_version_type(type_, None) is None:
+            return super().get_versions(type_, keys, exact=exact, indices=indices)
+        elif indices:
+            raise ValueError(f"{type_} is in the overlay and its base, so it does not have one list to index.")
+
+        np = get_numpy()
+        unique, inverse = get_unique_keys(keys.tolist() if getattr(keys, "ndim", 1) == 2 else keys)
+        objects = np.empty(len(unique), dtype=object)
+        for i, key in enumerate(unique):
+            objects[i] = self.get_version(type_, key, exact=exact)
+        return objects[inverse]
+
+    def get_version_cached(
+        self,
+        type_: str | VersionType,
+        key: Version | Iterable[int] | str | int,
+        exact: bool = False,
+    ) -> Any:
+        """Gets an object through the dispatch cache of the base if the overlay does not have the type.
+
+        The overlay does not cache its own lookups because they depend on the base which can change without the overlay
+        knowing.
+
+        Args:
+            type_: The type of versioned object to get.
+            key: The key to search for the versioned object with.
+            exact: Determines whether the exact version is need or return the closest version.
+
+        Returns
+            obj: The versioned object.
+        """
+        if isinstance(type_, VersionType):
+            type_ = type_.name
+
+        if type_ not in self.data:
+            return self.base.get_version_cached(type_, key, exact=exact)
+        return self.get_version(type_, key, exact=exact)
+
+    def get_latest_version(self, type_: str | VersionType, default: Any = SENTINEL) -> Any:
+        """Gets the object with the latest version of a type from the overlay or the base.
+
+        Args:
+            type_: The type of versioned object to get.
+            default: A default object to return if a version cannot be found.
+
+        Returns
+            obj: The versioned object.
+        """
+        if isinstance(type_, VersionType):
+            type_ = type_.name
+
+        base_item = self.base.get_latest_version(type_, None)
+        if type_ not in self.data:
+            return self.base.get_latest_version(type_, default) if base_item is None else base_item
+
+        item = super().get_latest_version(type_, default)
+        if base_item is not None and item is not default and self.get_item_key(base_item) > self.get_item_key(item):
+            return base_item
+        return item
+
+    def _iter_range_items(
+        self,
+        type_: str,
+        lower: tuple | None,
+        upper: tuple | None,
+        include_lower: bool = True,
+        include_upper: bool = False,
+        reverse: bool = False,
+    ) -> Iterator[tuple[tuple, Any]]:
+        """Iterates over the sort keys and items of the overlay and the base between two sort keys in order.
+
+        Args:
+            type_: The name of the type of versioned object to iterate over.
+            lower: The lower bound sort key, None has no lower bound.
+            upper: The upper bound sort key, None has no upper bound.
+            include_lower: Determines if items with the lower bound key are included.
+            include_upper: Determines if items with the upper bound key are included.
+            reverse: Determines if the items are iterated over from newest to oldest.
+
+        Returns:
+            An iterator of the sort keys and items, the items may be weak references or lazy placeholders.
+        """
+        bounds = (lower, upper, include_lower, include_upper, reverse)
+        if type_ not in self.data:
+            return self.base._iter_range_items(type_, *bounds)
+        elif self.base.get_version_type(type_, None) is None:
+            return super()._iter_range_items(type_, *bounds)
+        else:
+            local = super()._iter_range_items(type_, *bounds)
+            return heapq.merge(local, self.base._iter_range_items(type_, *bounds), key=itemgetter(0), reverse=reverse)
+
+    def get_version_type(self, name: str, default: Any = SENTINEL) -> VersionType:
+        """Gets the type object being used as a key from the overlay or the base.
+
+        Args:
+            name: The name of the type object.
+            default: A default value to return if the version does not exist.
+
+        Returns:
+            The type object requested.
+        """
+        if name in self.data:
+            return self.data[name].version_type
+        return self.base.get_version_type(name, default)
@@ -0,0 +1,215 @@
+"""packedkeys.py
+Functions which pack version sort keys into 64-bit integers, so large numbers of versions can be searched with NumPy or
+stored in shared memory. NumPy is an optional dependency which is only imported by the functions that use it.
+"""
+# Package Header #
+from .header import *
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+from collections.abc import Iterable, Sequence
+from functools import cache
+from types import ModuleType
+from typing import Any
+
+# Third-Party Packages #
+from baseobjects.versioning import Version
+
+# Local Packages #
+
+
+# Definitions #
+# Functions #
+def get_numpy() -> ModuleType:
+    """Imports NumPy, which is only needed for the vectorized functions.
+
+    Returns:
+        The NumPy module.
+
+    Raises:
+        ImportError: If NumPy is not installed.
+    """
+    try:
+        import numpy
+    except ImportError as error:
+        raise ImportError("NumPy needs to be installed to resolve versions in bulk.") from error
+    return numpy
+
+
+@cache
+def get_key_layout(width: int) -> tuple[int, int, tuple[int, ...]]:
+    """Gets how the numbers of a sort key are packed into an integer, which is the same for every key of a width.
+
+    Args:
+        width: The number of numbers in the sort keys.
+
+    Returns:
+        The number of bits for each number, the mask of those bits, and the shift of each number from first to last.
+    """
+    bits = 63 // max(width, 1)
+    return bits, (1 << bits) - 1, tuple(range(bits * (width - 1), -1, -bits))
+
+
+def pack_key(key: tuple, width: int) -> int:
+    """Packs one sort key into an integer which is ordered the same as the sort key, without NumPy.
+
+    Each number is stored plus one, so the zeros which pad a shorter key are less than any number and a key is ordered
+    before the longer keys it is a prefix of.
+
+    Args:
+        key: The sort key to pack, which must not be longer than the width.
+        width: The number of numbers to pack from the key, shorter keys are padded with zeros.
+
+    Returns:
+        The packed key.
+
+    Raises:
+        ValueError: If a number is negative or too large to be packed.
+    """
+    bits, mask, _ = get_key_layout(width)
+    packed = 0
+    for number in key:
+        if not -1 < number < mask:
+            raise ValueError(f"Version numbers must be between 0 and {mask - 1} to be packed into {width}.")
+        packed = (packed << bits) | (number + 1)
+    return packed << (bits * (width - len(key)))
+
+
+def unpack_key(packed: int, width: int) -> tuple[int, ...]:
+    """Unpacks an integer into the sort key it was packed from.
+
+    Args:
+        packed: The packed key.
+        width: The number of numbers packed into the key.
+
+    Returns:
+        The sort key.
+    """
+    _, mask, shifts = get_key_layout(width)
+    key = tuple([((packed >> shift) & mask) - 1 for shift in shifts])
+    return key[: key.index(-1)] if key[-1] < 0 else key  # The padding of a shorter key unpacks to -1.
+
+
+def get_key_matrix(keys: Sequence[tuple] | Any, width: int) -> tuple[Any, Any]:
+    """Arranges sort keys into a matrix of their numbers and an array of their lengths.
+
+    Keys which are shorter than the width are padded with zeros, which the lengths tell apart from real zeros.
+
+    Args:
+        keys: The sort keys as a sequence of tuples or a two-dimensional integer array.
+        width: The number of columns of the matrix, which must be at least the length of the longest key.
+
+    Returns:
+        The int64 matrix of the numbers of the keys and the array of the lengths of the keys.
+
+    Raises:
+        TypeError: If the numbers of the keys are not integers which fit in 64 bits.
+    """
+    np = get_numpy()
+    if isinstance(keys, np.ndarray):
+        numbers = keys.reshape(len(keys), -1)
+        lengths = np.full(len(keys), numbers.shape[1], dtype=np.intp)
+    else:
+        lengths = np.fromiter(map(len, keys), dtype=np.intp, count=len(keys))
+        numbers = np.array([tuple(key) + (0,) * (width - len(key)) for key in keys]).reshape(len(keys), width)
+
+    if numbers.size and (numbers.dtype.kind not in "iu" or numbers.max() > np.iinfo(np.int64).max):
+        raise TypeError("The numbers of the sort keys must be integers which fit in 64 bits to be packed.")
+
+    matrix = np.zeros((len(keys), width), dtype=np.int64)
+    matrix[:, : numbers.shape[1]] = numbers
+    return matrix, lengths
+
+
+def get_key_columns(matrix: Any, lengths: Any) -> list[Any]:
+    """Gets the distinct numbers in each column of sort keys, which are the numbers the columns are ranked by.
+
+    Args:
+        matrix: The int64 matrix of the numbers of the keys.
+        lengths: The array of the lengths of the keys.
+
+    Returns:
+        The sorted distinct numbers of each column, not including the padding of shorter keys.
+    """
+    np = get_numpy()
+    return [np.unique(matrix[lengths > column, column]) for column in range(matrix.shape[1])]
+
+
+def pack_ranked_keys(matrix: Any, lengths: Any, columns: list[Any]) -> Any:
+    """Packs sort keys into 64-bit integers by the ranks of their numbers, so the integers are ordered like the keys.
+
+    Each number is replaced by its rank among the distinct numbers of its column. A number in the column is ranked
+    2 * (index + 1), a number which is not in the column is ranked between its neighbors with an odd rank, and the
+    padding of a shorter key is ranked 0, so a key is ordered before the longer keys it is a prefix of. Each column only
+    needs as many bits as its ranks, so keys with large numbers can be packed as long as the columns are not too
+    diverse. Keys which are searched for are packed with the columns of the keys they are searched in.
+
+    Args:
+        matrix: The int64 matrix of the numbers of the keys.
+        lengths: The array of the lengths of the keys.
+        columns: The sorted distinct numbers of each column to rank by.
+
+    Returns:
+        The packed keys as a one-dimensional int64 array.
+
+    Raises:
+        ValueError: If the ranks of the columns need more than 63 bits.
+    """
+    np = get_numpy()
+    bits = [(2 * len(values) + 1).bit_length() for values in columns]
+    if sum(bits) > 63:
+        raise ValueError(f"The ranks of the sort keys need {sum(bits)} bits, which is more than 63.")
+
+    packed = np.zeros(len(matrix), dtype=np.int64)
+    for column, (values, column_bits) in enumerate(zip(columns, bits)):
+        numbers = matrix[:, column]
+        positions = np.searchsorted(values, numbers)
+        present = positions < len(values)
+        present[present] = values[positions[present]] == numbers[present]
+        ranks = np.where(present, 2 * positions + 2, 2 * positions + 1)
+        ranks[lengths <= column] = 0
+        packed = (packed << column_bits) | ranks
+    return packed
+
+
+def get_unique_keys(keys: Iterable[Any]) -> tuple[list[Any], Any]:
+    """Gets the distinct version keys of many keys, so each distinct key only has to be parsed once.
+
+    String arrays are made distinct with NumPy, all other keys are made distinct by hashing them. Versions are hashed by
+    their type and numbers, and lists as tuples, since neither can be hashed directly.
+
+    Args:
+        keys: The version keys, which can be an array or any iterable of version keys.
+
+    Returns:
+        The distinct keys and an array of the index of the distinct key of each key.
+    """
+    np = get_numpy()
+    if isinstance(keys, np.ndarray) and keys.dtype.kind in "US":
+        unique, inverse = np.unique(keys, return_inverse=True)
+        return unique.tolist(), inverse.reshape(-1)
+
+    if isinstance(keys, np.ndarray):
+        keys = keys.tolist()
+    indices = {}
+    unique = []
+    inverse = []
+    for key in keys:
+        if isinstance(key, Version):
+            hash_key = (type(key), key.tuple())
+        elif isinstance(key, list):
+            hash_key = tuple(key)
+        else:
+            hash_key = key
+        index = indices.setdefault(hash_key, len(unique))
+        if index == len(unique):
+            unique.append(key)
+        inverse.append(index)
+    return unique, np.array(inverse, dtype=np.intp)
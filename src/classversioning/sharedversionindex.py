@@ -0,0 +1,285 @@
+"""sharedversionindex.py
+A sorted index of version sort keys in shared memory, so many processes can search one index that a single process
+publishes.
+"""
+# Package Header #
+from .header import *
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+import bisect
+from collections.abc import Callable, Iterable
+import time
+from typing import Any
+
+# Third-Party Packages #
+
+# Local Packages #
+from .packedkeys import pack_key, unpack_key
+
+
+# Definitions #
+HEADER_WORDS = 4
+GENERATION, COUNT, WIDTH, CAPACITY = range(HEADER_WORDS)
+WORD_SIZE = 8
+
+# The shared memory this process created, which stays registered with the resource tracker when it is attached to.
+created_names: set[str] = set()
+
+
+# Classes #
+class SharedVersionIndex:
+    """A sorted index of version sort keys in shared memory which one process publishes and many processes search.
+
+    The shared buffer is an array of 64-bit integers, a header of the generation, the number of keys, the number of
+    numbers in each key, and the capacity, followed by the sort keys packed into integers. The generation works like a
+    sequence lock, it is odd while the keys are being written, so a reader retries a search if the generation was odd
+    or changed while it searched. A reader only retries a limited number of times, yielding between each, so a
+    publisher which stopped while writing does not stall the readers. Readers can also compare generations to know
+    when the index has been updated.
+
+    The multiprocessing modules are only imported when an index is created or attached to, since they are slow to
+    import.
+
+    Class Attributes:
+        max_retries: The number of times a read is tried before giving up on a publisher which is writing.
+
+    Attributes:
+        shared_memory: The shared memory which holds the index.
+        owner: Determines if this object created the shared memory and is responsible for unlinking it.
+        _words: The shared memory as an array of 64-bit integers.
+
+    Args:
+        name: The name of the shared memory, None creates a new one with a random name.
+        capacity: The maximum number of keys the index can hold when it is created.
+        create: Determines if the shared memory is created or an existing one is attached to.
+    """
+    max_retries: int = 1000
+
+    # Magic Methods
+    # Construction/Destruction
+    def __init__(self, name: str | None = None, capacity: int = 1024, create: bool = True) -> None:
+        from multiprocessing import resource_tracker, shared_memory
+
+        # New Attributes #
+        self.owner: bool = create
+        if create:
+            size = (HEADER_WORDS + capacity) * WORD_SIZE
+            self.shared_memory: Any = shared_memory.SharedMemory(name, create=True, size=size)
+            created_names.add(self.shared_memory._name)
+        else:
+            self.shared_memory = shared_memory.SharedMemory(name)
+            # Attaching registers the memory with the resource tracker, which would unlink it when this process exits.
+            if self.shared_memory._name not in created_names:
+                resource_tracker.unregister(self.shared_memory._name, "shared_memory")
+        self._words: memoryview = self.shared_memory.buf.cast("q")
+
+        if create:
+            self._words[CAPACITY] = capacity
+
+    def __reduce__(self) -> tuple[Any, tuple[str]]:
+        """Reduces the index to its name for pickling, so it is attached to when it is unpickled in another process."""
+        return type(self).attach, (self.name,)
+
+    # Context Managers
+    def __enter__(self) -> "SharedVersionIndex":
+        """The context enter which returns this index."""
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        """The context exit which closes this index and unlinks it if this object created it."""
+        self.close()
+        if self.owner:
+            self.unlink()
+
+    # Class Methods
+    @classmethod
+    def attach(cls, name: str) -> "SharedVersionIndex":
+        """Attaches to an existing index by the name of its shared memory.
+
+        Args:
+            name: The name of the shared memory.
+
+        Returns:
+            The attached index.
+        """
+        return cls(name, create=False)
+
+    # Properties #
+    @property
+    def name(self) -> str:
+        """The name of the shared memory."""
+        return self.shared_memory.name
+
+    @property
+    def generation(self) -> int:
+        """The generation of the index, which changes each time keys are published."""
+        return self._words[GENERATION]
+
+    @property
+    def capacity(self) -> int:
+        """The maximum number of keys the index can hold."""
+        return self._words[CAPACITY]
+
+    # Instance Methods
+    def publish(self, keys: Iterable[tuple]) -> int:
+        """Writes sorted sort keys into the index, only one process should publish to an index.
+
+        If writing is interrupted, the index is left empty rather than with some of the keys.
+
+        Args:
+            keys: The sorted sort keys to publish.
+
+        Returns:
+            The new generation of the index.
+
+        Raises:
+            ValueError: If there are more keys than the capacity of the index or a key cannot be packed.
+        """
+        keys = list(keys)
+        if len(keys) > self.capacity:
+            raise ValueError(f"{len(keys)} keys do not fit in the shared index which can hold {self.capacity}.")
+
+        width = max(map(len, keys), default=1)
+        packed = [pack_key(key, width) for key in keys]
+
+        words = self._words
+        generation = words[GENERATION]
+        words[GENERATION] = generation + 1  # Odd while writing.
+        try:
+            words[COUNT] = len(packed)
+            words[WIDTH] = width
+            for i, value in enumerate(packed, HEADER_WORDS):
+                words[i] = value
+        except BaseException:
+            words[COUNT] = 0
+            raise
+        finally:
+            words[GENERATION] = generation + 2
+        return generation + 2
+
+    def invalidate(self) -> int:
+        """Marks the index as unusable, so readers search their own keys until keys are published again.
+
+        Returns:
+            The new generation of the index.
+        """
+        words = self._words
+        generation = words[GENERATION]
+        words[GENERATION] = generation + 1
+        words[COUNT] = -1
+        words[GENERATION] = generation + 2
+        return generation + 2
+
+    def find(self, key: tuple, exact: bool = False, before: bool = False) -> tuple[int, ...] | None:
+        """Searches the index for a sort key or the greatest sort key which is less than or equal to it.
+
+        Args:
+            key: The sort key to search for.
+            exact: Determines whether the exact sort key is needed or return the closest sort key.
+            before: Determines if the closest sort key must be less than the sort key rather than less or equal.
+
+        Returns:
+            The sort key found or None if there is no closest or exact sort key.
+
+        Raises:
+            ValueError: If the sort key cannot be packed or the index has been invalidated.
+            TimeoutError: If the publisher is writing to the index each time it is read.
+        """
+        return self._read(self._find, key, exact, before)
+
+    def keys(self) -> list[tuple[int, ...]]:
+        """Gets a copy of the sort keys in the index.
+
+        Returns:
+            The sort keys in order.
+
+        Raises:
+            ValueError: If the index has been invalidated.
+            TimeoutError: If the publisher is writing to the index each time it is read.
+        """
+        return self._read(lambda words, stop, width: [unpack_key(words[i], width) for i in range(HEADER_WORDS, stop)])
+
+    def _read(self, read: Callable[..., Any], *args: Any) -> Any:
+        """Reads the packed keys of the index, retrying if the publisher wrote to the index while it was being read.
+
+        Args:
+            read: The function which reads the words, the end of the packed keys, and their width, followed by the
+                arguments.
+            *args: The arguments for the function after the width.
+
+        Returns:
+            The result of the function.
+
+        Raises:
+            ValueError: If the index has been invalidated.
+            TimeoutError: If the publisher is writing to the index each time it is read.
+        """
+        words = self._words
+        for _ in range(self.max_retries):
+            generation = words[GENERATION]
+            if not generation % 2:
+                count = words[COUNT]
+                try:
+                    result = read(words, HEADER_WORDS + count, words[WIDTH], *args) if count >= 0 else None
+                except ValueError:
+                    if words[GENERATION] == generation:
+                        raise
+                else:
+                    if words[GENERATION] == generation:
+                        if count < 0:
+                            raise ValueError(f"The shared index {self.name} has been invalidated by its publisher.")
+                        return result
+            time.sleep(0)
+        raise TimeoutError(f"The shared index {self.name} was being written to each of {self.max_retries} reads.")
+
+    @staticmethod
+    def _find(
+        words: memoryview,
+        stop: int,
+        width: int,
+        key: tuple,
+        exact: bool,
+        before: bool,
+    ) -> tuple[int, ...] | None:
+        """Searches the packed keys for a sort key or the closest sort key before it.
+
+        Args:
+            words: The shared memory as an array of 64-bit integers.
+            stop: The index of the word after the last packed key.
+            width: The number of numbers packed into each key.
+            key: The sort key to search for.
+            exact: Determines whether the exact sort key is needed or return the closest sort key.
+            before: Determines if the closest sort key must be less than the sort key rather than less or equal.
+
+        Returns:
+            The sort key found or None if there is no closest or exact sort key.
+        """
+        # A key longer than the keys is after the keys it starts with, so it is searched for by those numbers.
+        truncated = len(key) > width
+        if stop == HEADER_WORDS or (exact and truncated):
+            return None
+
+        search_key = pack_key(key[:width] if truncated else key, width)
+        search = bisect.bisect_left if before and not truncated else bisect.bisect_right
+        index = search(words, search_key, HEADER_WORDS, stop) - 1
+        if index < HEADER_WORDS or (exact and words[index] != search_key):
+            return None
+        return unpack_key(words[index], width)
+
+    def close(self) -> None:
+        """Closes this process's access to the shared memory."""
+        self._words.release()
+        self.shared_memory.close()
+
+    def unlink(self) -> None:
+        """Destroys the shared memory, which should only be done by the process which created it."""
+        created_names.discard(self.shared_memory._name)
+        self.shared_memory.unlink()
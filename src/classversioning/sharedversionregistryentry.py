@@ -0,0 +1,108 @@
+"""sharedversionregistryentry.py
+An entry of a VersionRegistry which searches a shared index for its sort keys, so it only holds an exact index.
+"""
+# Package Header #
+from .header import *
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+from typing import Any
+
+# Third-Party Packages #
+from baseobjects.versioning import VersionType
+
+# Local Packages #
+from .sharedversionindex import SharedVersionIndex
+from .versionregistryentry import VersionRegistryEntry
+
+
+# Definitions #
+# Classes #
+class SharedVersionRegistryEntry(VersionRegistryEntry):
+    """An entry of a registry in a process which reads the sort keys of its type from a shared index.
+
+    The entry only holds the exact index of the versioned objects this process has registered, the sorted lists are
+    not kept or rebuilt when objects are added. The closest version is found by searching the shared index for the
+    greatest sort key which this process has registered. The versions and sort keys are still available, but they are
+    created from the exact index each time they are accessed.
+
+    Searching shared memory takes a few microseconds longer than searching a local list, so repeated lookups should go
+    through the dispatch cache, which the registry clears when the publisher changes the index.
+
+    Attributes:
+        index: The shared index of the sort keys of the type.
+
+    Args:
+        version_type: The type of the versioned objects.
+        index: The shared index of the sort keys of the type.
+        exact: The first versioned object of each sort key.
+    """
+
+    __slots__ = ("index",)
+
+    # Properties #
+    @property
+    def versions(self) -> list[Any]:
+        """The versioned objects in order by version, created from the exact index."""
+        exact = self.exact
+        return [exact[key] for key in self.sort_keys]
+
+    @property
+    def sort_keys(self) -> list[tuple]:
+        """The sort keys of the versioned objects in order, created from the exact index."""
+        return sorted(self.exact)
+
+    @property
+    def latest(self) -> Any:
+        """The item with the latest version or None if the entry is empty."""
+        return self.exact[max(self.exact)] if self.exact else None
+
+    # Magic Methods
+    # Construction/Destruction
+    def __init__(
+        self,
+        version_type: VersionType,
+        index: SharedVersionIndex,
+        exact: dict[tuple, Any] | None = None,
+    ) -> None:
+        # New Attributes #
+        self.version_type: VersionType = version_type
+        self.index: SharedVersionIndex = index
+        self.exact: dict[tuple, Any] = {} if exact is None else exact
+
+    # Instance Methods
+    def find(self, key: tuple) -> Any:
+        """Finds the item of the greatest sort key in the shared index which is less than or equal to a sort key.
+
+        Sort keys in the shared index which this process has not registered are skipped. If the shared index cannot be
+        searched, the exact index is searched instead.
+
+        Args:
+            key: The sort key to search with.
+
+        Returns:
+            The item found or None if there is no closest sort key.
+        """
+        exact = self.exact
+        try:
+            found = self.index.find(key)
+            while found is not None and found not in exact:
+                found = self.index.find(found, before=True)
+        except (ValueError, TimeoutError):
+            found = max((registered for registered in exact if registered <= key), default=None)
+        return None if found is None else exact[found]
+
+    def copy(self) -> "SharedVersionRegistryEntry":
+        """Creates a copy of the entry with a copy of its exact index.
+
+        Returns:
+            The copy of the entry.
+        """
+        return type(self)(self.version_type, self.index, self.exact.copy())
@@ -15,32 +15,69 @@ __email__ = __email__
 
 # Imports #
 # Standard Libraries #
-from typing import Any, Iterable
+import asyncio
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import AbstractContextManager
+from functools import partial
+from typing import Any
 
 # Third-Party Packages #
 from baseobjects.versioning import VersionType
 from baseobjects.versioning import Version
 
 # Local Packages #
+from .caches import DispatchCache, FileVersionCache, version_intern_cache
+from .detectors import VersionDetector
+from .instrumentation import DispatchInstrumentation
 from .meta import VersionedMeta
+from .overlayversionregistry import OverlayVersionRegistry, get_active_registry, overlay_registry
 from .versionregistry import VersionRegistry
 
 
 # Definitions #
+EXECUTORS = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
+
+
+# Functions #
+def _detect_version(cls: type, obj: Any) -> tuple[bool, Any]:
+    """Gets the version of an object from a versioned class, this is at module level so process pools can pickle it.
+
+    Args:
+        cls: The versioned class to get the version with.
+        obj: The object to get the version from.
+
+    Returns:
+        If the object's file was found and the version of the object.
+    """
+    try:
+        return True, cls.detect_version(obj)
+    except FileNotFoundError:
+        return False, None
+
+
 # Classes #
 class VersionedClass(metaclass=VersionedMeta):
     """An abstract class allows child classes to specify its version which it can use to compare.
 
     Class Attributes:
         _registry: A registry of all subclasses and versions of this class.
+        _isolate_registry: Determines if a version head creates its own registry rather than sharing its parent's.
         _dispatch_kwarg: The name of the kwarg to use for version dispatching when a new object is made.
         _registration: Specifies if versions will be tracked and will recurse to parent.
+        _single_construction: Determines if dispatching constructs the resolved class once rather than calling it.
+        _version_cache: An optional cache of the versions detected from files, None disables caching.
+        _version_detector: An optional detector which gets the version from objects when dispatching.
         _VERSION_TYPE: The type of version this object will be.
         VERSION: The version of this class as a string.
     """
     _registry: VersionRegistry = VersionRegistry()
+    _isolate_registry: bool = False
     _dispatch_kwarg: str = "obj"
     _registration: bool = True
+    _single_construction: bool = True
+    _version_cache: FileVersionCache | None = None
+    _version_detector: VersionDetector | None = None
     _VERSION_TYPE: VersionType = None
     VERSION: Version = None
 
@@ -52,24 +89,122 @@ class VersionedClass(metaclass=VersionedMeta):
 
         if cls._VERSION_TYPE.head_class is None:
             cls._VERSION_TYPE.head_class = cls
+            if cls._isolate_registry and "_registry" not in cls.__dict__:
+                cls._registry = VersionRegistry(thread_safe=cls._registry.thread_safe, weak=cls._registry.weak)
 
         type_ = cls._VERSION_TYPE
         class_ = cls._VERSION_TYPE.class_
 
         if not isinstance(cls.VERSION, class_):
-            cls.VERSION = class_(cls.VERSION)
+            cls.VERSION = version_intern_cache.get_version(type_, cls.VERSION)
 
         cls.VERSION.version_type = type_
+        cls._VERSION_KEY = cls.VERSION.tuple()
 
         if cls._registration:
-            cls._registry.add_item(cls, type_)
+            cls.get_registry().add_item(cls, type_)
 
     # Class Methods
+    @classmethod
+    def get_registry(cls) -> VersionRegistry:
+        """Gets the active registry of this class, which is the innermost overlay of the registry in this context.
+
+        Returns:
+            The active registry of this class.
+        """
+        return get_active_registry(cls._registry)
+
+    @classmethod
+    def overlay_registry(cls) -> AbstractContextManager[OverlayVersionRegistry]:
+        """Creates a context where the registry of this class is layered with an overlay for temporary versions.
+
+        Versions defined within the context are only added to the overlay and lookups within the context see both the
+        overlay and the registry. The overlay is only active in the current context, so other threads and tasks do not
+        see it.
+
+        Returns:
+            The context manager which yields the overlay.
+        """
+        return overlay_registry(cls._registry)
+
+    @classmethod
+    def register_lazy_version(cls, version: Version | str | Iterable, path: str) -> Any:
+        """Registers a version of this class by its import path, so it is only imported when dispatching selects it.
+
+        Args:
+            version: The version of the class.
+            path: The import path of the class, either "module:qualname" or "module.name".
+
+        Returns:
+            The placeholder which was registered or the class if it is already registered.
+        """
+        return cls.get_registry().add_lazy_item(cls._VERSION_TYPE, version, path)
+
+    @classmethod
+    def register_entry_points(cls, group: str | None = None) -> list[Any]:
+        """Registers the versions of this class lazily from the entry points of installed packages.
+
+        The name of each entry point is the version of the class and the value is its import path.
+
+        Args:
+            group: The entry point group to register, defaults to "classversioning." followed by the version type name.
+
+        Returns:
+            The placeholders or classes which were registered.
+        """
+        return cls.get_registry().add_entry_points(cls._VERSION_TYPE, group)
+
     @classmethod
     def get_version_from_object(cls, obj: Any) -> Version | str | Iterable:
-        """An optional abstract method that must return a version from an object."""
+        """An optional abstract method that must return a version from an object.
+
+        If the version head has a version detector, it is used to get the version, otherwise this method needs to be
+        overridden in the version head.
+        """
+        if cls._version_detector is not None:
+            return cls._version_detector(obj)
         raise NotImplementedError("This method needs to be set in the version head to dispatch the propper class.")
 
+    @classmethod
+    def detect_version(cls, obj: Any) -> Version | str | Iterable:
+        """Gets a version from an object through the version cache if this class has one.
+
+        Args:
+            obj: The object to get the version from.
+
+        Returns:
+            The version of the object.
+        """
+        if cls._version_cache is None:
+            return cls.get_version_from_object(obj)
+        else:
+            return cls._version_cache.get_version(obj, cls.get_version_from_object)
+
+    @classmethod
+    def invalidate_version_cache(cls, path: Any = None) -> None:
+        """Removes the cached version of a file from the version cache if this class has one.
+
+        Args:
+            path: The path of the file to remove, None removes all files.
+        """
+        if cls._version_cache is not None:
+            cls._version_cache.invalidate(path)
+
+    @classmethod
+    async def get_version_from_object_async(cls, obj: Any) -> Version | str | Iterable:
+        """Gets a version from an object without blocking the event loop.
+
+        By default, this runs detect_version in a thread, but it can be overridden in the version head to get the
+        version with asynchronous I/O.
+
+        Args:
+            obj: The object to get the version from.
+
+        Returns:
+            The version of the object.
+        """
+        return await asyncio.to_thread(cls.detect_version, obj)
+
     @classmethod
     def get_version_class(
         cls,
@@ -78,7 +213,7 @@ class VersionedClass(metaclass=VersionedMeta):
         exact: bool = False,
         sort: bool = False,
     ) -> "VersionedClass":
-        """Gets a class based on the version.
+        """Gets a class based on the version, lookups are memoized by the dispatch cache of the registry.
 
         Args:
             version: The key to search for the class with.
@@ -92,10 +227,243 @@ class VersionedClass(metaclass=VersionedMeta):
         if type_ is None:
             type_ = cls._VERSION_TYPE
 
+        registry = cls.get_registry()
         if sort:
-            cls._registry.sort(type_)
+            registry.sort(type_)
 
-        return cls._registry.get_version(type_, version, exact=exact)
+        return registry.get_version_cached(type_, version, exact=exact)
+
+    @classmethod
+    def get_version_classes(
+        cls,
+        versions: Iterable[Version | str | Iterable] | Any,
+        type_: str | None = None,
+        exact: bool = False,
+    ) -> Any:
+        """Gets the classes of many versions at once with a single vectorized search, which requires NumPy.
+
+        Args:
+            versions: The versions as a sequence or array of version strings, tuples, or versions.
+            type_: The type of class to get.
+            exact: Determines whether the exact versions are needed or return the closest versions.
+
+        Returns:
+            An object array of the classes found.
+        """
+        if type_ is None:
+            type_ = cls._VERSION_TYPE
+        return cls.get_registry().get_versions(type_, versions, exact=exact)
+
+    @classmethod
+    def resolve_version_class(cls, obj: Any, resolved: dict[Any, "VersionedClass"] | None = None) -> "VersionedClass":
+        """Gets the class an object dispatches to, memoizing the resolution of each distinct version.
+
+        Args:
+            obj: The object to get the version from.
+            resolved: The classes which have already been resolved by version.
+
+        Returns:
+            The class the object dispatches to, or this class if the object's file could not be found.
+        """
+        try:
+            version = cls.detect_version(obj)
+        except FileNotFoundError:
+            return cls
+        return cls._resolve_version(version, resolved)
+
+    @classmethod
+    def _resolve_version(
+        cls,
+        version: Version | str | Iterable,
+        resolved: dict[Any, "VersionedClass"] | None = None,
+    ) -> "VersionedClass":
+        """Gets the class of a version, memoizing the resolution of each distinct version.
+
+        Args:
+            version: The version to get the class of.
+            resolved: The classes which have already been resolved by version.
+
+        Returns:
+            The class of the version.
+        """
+        name = cls._VERSION_TYPE.name
+        key = None if resolved is None else DispatchCache.create_key(name, version)
+        if key is None:
+            return cls.get_version_class(version, type_=name)
+
+        class_ = resolved.get(key, None)
+        if class_ is None:
+            resolved[key] = class_ = cls.get_version_class(version, type_=name)
+        return class_
+
+    @classmethod
+    def _construct_dispatched(cls, class_: "VersionedClass", *args: Any, **kwargs: Any) -> "VersionedClass":
+        """Constructs an object of a class resolved by dispatching, without dispatching again.
+
+        Args:
+            class_: The resolved class to construct.
+            *args: The arguments for constructing the object.
+            **kwargs: The keyword arguments for constructing the object.
+
+        Returns:
+            The constructed object.
+        """
+        if class_ is cls:
+            new_obj = cls.__new__(cls)
+            new_obj.__init__(*args, **kwargs)
+            return new_obj
+        else:
+            return class_(*args, **kwargs)
+
+    @classmethod
+    def _dispatch_detections(
+        cls,
+        objs: Iterable[Any],
+        detections: Iterable[tuple[bool, Any]],
+        construct: bool = True,
+        **kwargs: Any,
+    ) -> list[Any]:
+        """Resolves the classes of objects from their detected versions and constructs the objects.
+
+        Args:
+            objs: The objects to dispatch which are given as the first argument when constructing.
+            detections: Whether each object's version was found and the version, parallel to the objects.
+            construct: Determines if the objects are constructed or only their classes are resolved.
+            **kwargs: The keyword arguments for constructing the objects.
+
+        Returns:
+            The constructed objects or resolved classes in the order of the given objects.
+        """
+        resolved = {}
+        dispatched = []
+        for obj, (found, version) in zip(objs, detections):
+            class_ = cls._resolve_version(version, resolved) if found else cls
+            dispatched.append(cls._construct_dispatched(class_, obj, **kwargs) if construct else class_)
+        return dispatched
+
+    @classmethod
+    def iter_dispatch(cls, objs: Iterable[Any], construct: bool = True, **kwargs: Any) -> Iterator[Any]:
+        """Dispatches each object to its versioned class as the objects are iterated over.
+
+        Each distinct version is only resolved against the registry once, so large iterables of objects can be
+        streamed through without being held in memory.
+
+        Args:
+            objs: The objects to dispatch which are given as the first argument when constructing.
+            construct: Determines if the objects are constructed or only their classes are resolved.
+            **kwargs: The keyword arguments for constructing the objects.
+
+        Yields:
+            The constructed objects or resolved classes in the order of the given objects.
+        """
+        resolved = {}
+        for obj in objs:
+            class_ = cls.resolve_version_class(obj, resolved)
+            yield cls._construct_dispatched(class_, obj, **kwargs) if construct else class_
+
+    @classmethod
+    def dispatch_many(cls, objs: Iterable[Any], construct: bool = True, **kwargs: Any) -> list[Any]:
+        """Dispatches many objects to their versioned classes, resolving each distinct version only once.
+
+        Args:
+            objs: The objects to dispatch which are given as the first argument when constructing.
+            construct: Determines if the objects are constructed or only their classes are resolved.
+            **kwargs: The keyword arguments for constructing the objects.
+
+        Returns:
+            The constructed objects or resolved classes in the order of the given objects.
+        """
+        return list(cls.iter_dispatch(objs, construct=construct, **kwargs))
+
+    @classmethod
+    def dispatch_parallel(
+        cls,
+        objs: Iterable[Any],
+        construct: bool = True,
+        executor: Executor | str = "thread",
+        max_workers: int | None = None,
+        chunksize: int = 1,
+        **kwargs: Any,
+    ) -> list[Any]:
+        """Dispatches many objects to their versioned classes, getting their versions in parallel.
+
+        Only getting the versions from the objects is done by the executor, the classes are resolved and the objects
+        are constructed in the calling thread. A process pool requires this class to be importable and the objects to
+        be picklable.
+
+        Args:
+            objs: The objects to dispatch which are given as the first argument when constructing.
+            construct: Determines if the objects are constructed or only their classes are resolved.
+            executor: The executor to use or the name of the kind of executor to create, either "thread" or "process".
+            max_workers: The maximum number of workers of a created executor.
+            chunksize: The number of objects sent to a process at a time.
+            **kwargs: The keyword arguments for constructing the objects.
+
+        Returns:
+            The constructed objects or resolved classes in the order of the given objects.
+        """
+        if isinstance(executor, str):
+            with EXECUTORS[executor](max_workers=max_workers) as pool:
+                return cls.dispatch_parallel(objs, construct, pool, chunksize=chunksize, **kwargs)
+
+        objs = list(objs)
+        detections = executor.map(partial(_detect_version, cls), objs, chunksize=chunksize)
+        return cls._dispatch_detections(objs, detections, construct, **kwargs)
+
+    @classmethod
+    async def new_async(cls, *args: Any, **kwargs: Any) -> "VersionedClass":
+        """Creates an object of the correct subclass, getting the version of the given input asynchronously.
+
+        Args:
+            *args: The arguments for constructing the object.
+            **kwargs: The keyword arguments for constructing the object.
+
+        Returns:
+            The constructed object.
+        """
+        if cls._get_dispatch_type(cls.get_registry(), args, kwargs) is None:
+            return cls._construct_dispatched(cls, *args, **kwargs)
+
+        try:
+            version = await cls.get_version_from_object_async(args[0] if args else kwargs[cls._dispatch_kwarg])
+            class_ = cls.get_version_class(version, type_=cls._VERSION_TYPE.name)
+        except FileNotFoundError:
+            class_ = cls
+        return cls._construct_dispatched(class_, *args, **kwargs)
+
+    @classmethod
+    async def dispatch_async(
+        cls,
+        objs: Iterable[Any],
+        construct: bool = True,
+        max_concurrency: int | None = None,
+        **kwargs: Any,
+    ) -> list[Any]:
+        """Dispatches many objects to their versioned classes, getting their versions concurrently.
+
+        Args:
+            objs: The objects to dispatch which are given as the first argument when constructing.
+            construct: Determines if the objects are constructed or only their classes are resolved.
+            max_concurrency: The maximum number of versions to get at once, None does not limit it.
+            **kwargs: The keyword arguments for constructing the objects.
+
+        Returns:
+            The constructed objects or resolved classes in the order of the given objects.
+        """
+        semaphore = None if max_concurrency is None else asyncio.Semaphore(max_concurrency)
+
+        async def detect(obj: Any) -> tuple[bool, Any]:
+            try:
+                if semaphore is None:
+                    return True, await cls.get_version_from_object_async(obj)
+                async with semaphore:
+                    return True, await cls.get_version_from_object_async(obj)
+            except FileNotFoundError:
+                return False, None
+
+        objs = list(objs)
+        detections = await asyncio.gather(*(detect(obj) for obj in objs))
+        return cls._dispatch_detections(objs, detections, construct, **kwargs)
 
     @classmethod
     def get_latest_version_class(cls, type_: str | VersionType | None = None, sort: bool = False) -> "VersionedClass":
@@ -111,22 +479,130 @@ class VersionedClass(metaclass=VersionedMeta):
         if type_ is None:
             type_ = cls._VERSION_TYPE
 
+        registry = cls.get_registry()
         if sort:
-            cls._registry.sort(type_)
+            registry.sort(type_)
+
+        return registry.get_latest_version(type_, cls)
 
-        return cls._registry.get_latest_version(type_, cls)
+    @classmethod
+    def _get_dispatch_type(cls, registry: Any, args: tuple, kwargs: dict[str, Any]) -> VersionType | None:
+        """Gets the version type this class dispatches with, which only a version head given an object to dispatch does.
+
+        Args:
+            registry: The registry of this class.
+            args: The arguments for constructing the object.
+            kwargs: The keyword arguments for constructing the object.
+
+        Returns:
+            The version type of this class or None if constructing this class does not dispatch.
+        """
+        version_type = registry.get_version_type(cls._VERSION_TYPE.name, None)
+        if version_type is not None and version_type.head_class is cls and (kwargs or args):
+            return version_type
+        else:
+            return None
+
+    @classmethod
+    def _resolve_dispatch(
+        cls,
+        obj: Any,
+        instrumentation: DispatchInstrumentation | None = None,
+    ) -> "VersionedClass":
+        """Gets the class an object dispatches to, counting and timing the detection if the registry is instrumented.
+
+        Args:
+            obj: The object to get the version from.
+            instrumentation: The instrumentation to count and time with, None if the registry is not instrumented.
+
+        Returns:
+            The class the object dispatches to, or this class if the object's file could not be found.
+        """
+        name = cls._VERSION_TYPE.name
+        try:
+            if instrumentation is None:
+                version = cls.detect_version(obj)
+            else:
+                instrumentation.count(name, "dispatch")
+                version = instrumentation.measure(name, "detect", cls.detect_version, obj)
+            return cls.get_version_class(version, type_=name)
+        except FileNotFoundError:
+            if instrumentation is not None:
+                instrumentation.count(name, "not_found")
+            return cls
+
+    @classmethod
+    def _new_resolved(cls, class_: "VersionedClass", *args: Any, **kwargs: Any) -> "VersionedClass":
+        """Creates a new object of the class resolved by dispatching, which Python then initializes if it is needed.
+
+        Args:
+            class_: The resolved class to create the object of.
+            *args: The arguments for constructing the object.
+            **kwargs: The keyword arguments for constructing the object.
+
+        Returns:
+            The new object.
+        """
+        if class_ is cls:
+            return super().__new__(cls)
+        elif not cls._single_construction:
+            return class_(*args, **kwargs)
+        else:
+            return cls._new_dispatched(class_, *args, **kwargs)
+
+    @classmethod
+    def _new_instrumented(
+        cls,
+        instrumentation: DispatchInstrumentation,
+        *args: Any,
+        **kwargs: Any,
+    ) -> "VersionedClass":
+        """Creates a new object of the correct subclass while counting and timing the phases of the dispatch.
+
+        Args:
+            instrumentation: The instrumentation to count and time with.
+            *args: The arguments for constructing the object.
+            **kwargs: The keyword arguments for constructing the object.
+
+        Returns:
+            The new object.
+        """
+        class_ = cls._resolve_dispatch(args[0] if args else kwargs[cls._dispatch_kwarg], instrumentation)
+        return instrumentation.measure(cls._VERSION_TYPE.name, "construct", cls._new_resolved, class_, *args, **kwargs)
+
+    @classmethod
+    def _new_dispatched(cls, class_: "VersionedClass", *args: Any, **kwargs: Any) -> "VersionedClass":
+        """Creates a new object of a dispatched class, initializing it if Python will not.
+
+        Args:
+            class_: The dispatched class to create the object of.
+            *args: The arguments for constructing the object.
+            **kwargs: The keyword arguments for constructing the object.
+
+        Returns:
+            The new object.
+        """
+        obj = class_.__new__(class_, *args, **kwargs)
+        # Python only initializes the object if it is an instance of this class, so the others are initialized here
+        if not isinstance(obj, cls):
+            obj.__init__(*args, **kwargs)
+        return obj
 
     # Magic Methods
     # Construction/Destruction
     def __new__(cls, *args: Any, **kwargs: Any) -> "VersionedClass":
-        """With given input, will return the correct subclass."""
-        version_type = cls._registry.get_version_type(cls._VERSION_TYPE.name, None)
-        if version_type is not None and version_type.head_class is cls and (kwargs or args):
-            try:
-                version = cls.get_version_from_object(args[0] if args else kwargs[cls._dispatch_kwarg])
-                class_ = cls.get_version_class(version, type_=cls._VERSION_TYPE.name)
-                return class_(*args, **kwargs)
-            except FileNotFoundError:
-                return super().__new__(cls)
-        else:
+        """With given input, will return the correct subclass.
+
+        When single construction is enabled, only a new object of the correct subclass is created here which Python
+        then initializes, otherwise the subclass is called and its object is initialized a second time by Python.
+        """
+        registry = cls.get_registry()
+        version_type = cls._get_dispatch_type(registry, args, kwargs)
+        if version_type is None:
             return super().__new__(cls)
+        elif registry.instrumentation is not None:
+            instrumentation = registry.instrumentation
+            return instrumentation.measure(version_type.name, "dispatch", cls._new_instrumented, instrumentation, *args, **kwargs)
+        else:
+            class_ = cls._resolve_dispatch(args[0] if args else kwargs[cls._dispatch_kwarg])
+            return cls._new_resolved(class_, *args, **kwargs)
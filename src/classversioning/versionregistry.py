@@ -17,13 +17,28 @@ __email__ = __email__
 # Standard Libraries #
 import bisect
 from collections import UserDict
-from collections.abc import Iterable
+from collections.abc import Callable, Generator, Iterable, Iterator
+from contextlib import contextmanager
+from functools import partial
+import json
+from operator import itemgetter
+import os
+import threading
 from typing import Any
+import warnings
+import weakref
 
 # Third-Party Packages #
 from baseobjects.versioning import VersionType, Version
 
 # Local Packages #
+from .caches import DispatchCache, version_intern_cache
+from .instrumentation import DispatchInstrumentation
+from .lazyversioneditem import LazyVersionedItem
+from .packedkeys import get_key_columns, get_key_matrix, get_numpy, get_unique_keys, pack_ranked_keys
+from .sharedversionindex import SharedVersionIndex
+from .sharedversionregistryentry import SharedVersionRegistryEntry
+from .versionregistryentry import VersionRegistryEntry
 
 
 # Definitions #
@@ -35,10 +50,219 @@ class VersionRegistry(UserDict):
     """A dictionary like class that holds versioned objects.
 
     The keys distinguish different types of objects from one another, so their version are not mixed together. The items
-    are lists containing the versioned objects in order by version.
+    are slotted entries containing the type of version, a list of the versioned objects in order by version, a parallel
+    list of the precomputed sort keys of those versioned objects, and an exact index which maps the sort keys to the
+    first versioned object with that key. The entries can also be accessed like dictionaries, as they used to be. The
+    sort keys are plain tuples, so searching them does not need to go through the comparison methods of the versioned
+    objects.
+
+    Versioned objects can also be registered lazily by their version and import path. A placeholder is sorted and
+    searched in their place and the object is only imported when a lookup selects it. The index of a registry can be
+    exported to a file and loaded as lazy placeholders, so a new process gets a sorted registry without importing any
+    of the versioned objects.
+
+    Changes to the registry are serialized by a lock. When the registry is thread safe, changes are made to a copy of
+    an entry which is then published by replacing the entry, so lookups never take the lock and always see a complete,
+    sorted entry.
+
+    Many objects can be added at once with add_items or within bulk_load, which append the objects and sort each entry
+    once, rather than inserting each object into its sorted position.
+
+    When the registry is weak, the lists and exact indices hold weak references to the versioned objects, so objects
+    which are no longer used elsewhere, such as dynamically created classes, can be garbage collected. Collected objects
+    are purged from the entries and their sort keys and exact indices are rebuilt with them.
+
+    The sort keys of a type can be published to a shared memory index, which the publishing process updates whenever
+    the type changes. Other processes, such as forked workers, search the shared index for the closest versions and
+    then get the objects of those versions from their own exact indices, and their dispatch caches are invalidated when
+    the generation of the shared index changes.
+
+    Instrumentation can be enabled to count the lookups and time the phases of the lookups and dispatches which use the
+    registry, when it is disabled the only cost is checking if it is set.
+
+    Attributes:
+        dispatch_cache: A cache of the versioned objects resolved from version keys.
+        thread_safe: Determines if entries are copied on write, so they can be looked up while being changed.
+        weak: Determines if the registry holds weak references to the versioned objects.
+        instrumentation: The instrumentation which counts and times the lookups, None when it is disabled.
+        shared_indexes: The shared memory indices of the sort keys of types, which are published or attached to.
+        _lock: The lock which serializes the changes to the registry.
+        _collected: The names of the types which have had objects collected that have not been purged yet.
+        _bulk: The thread local state of bulk loads, which holds the objects and types each thread is waiting to add at
+            the end of its bulk load.
+        _packed_keys: The sort keys of each type packed into integers for bulk lookups, with the entry they are from.
+        _shared_publishers: The ID of the process which publishes the shared index of each type.
+        _shared_generations: The generation of the shared index of each type when the dispatch cache was last valid.
+
+    Args:
+        dict_: A dictionary to fill this registry with.
+        dispatch_cache_size: The maximum number of lookups the dispatch cache holds, zero disables the cache.
+        thread_safe: Determines if entries are copied on write, so they can be looked up while being changed.
+        weak: Determines if the registry holds weak references to the versioned objects.
+        **kwargs: The items to fill this registry with.
     """
 
+    # Magic Methods
+    # Construction/Destruction
+    def __init__(
+        self,
+        dict_: Any = None,
+        /,
+        dispatch_cache_size: int = 256,
+        thread_safe: bool = False,
+        weak: bool = False,
+        **kwargs: Any,
+    ) -> None:
+        # New Attributes #
+        self.dispatch_cache: DispatchCache = DispatchCache(maxsize=dispatch_cache_size)
+        self.thread_safe: bool = thread_safe
+        self.weak: bool = weak
+        self.instrumentation: DispatchInstrumentation | None = None
+        self._lock: threading.Lock = threading.Lock()
+        self._collected: set[str] = set()
+        self._bulk: threading.local = threading.local()
+        self._packed_keys: dict[str, tuple[VersionRegistryEntry, int, int, tuple | None]] = {}
+        self.shared_indexes: dict[str, SharedVersionIndex] = {}
+        self._shared_publishers: dict[str, int] = {}
+        self._shared_generations: dict[str, int] = {}
+
+        # Parent Attributes #
+        super().__init__(dict_, **kwargs)
+
+    # Container Methods
+    def __setitem__(self, key: str, value: VersionRegistryEntry | dict[str, Any]) -> None:
+        """Sets the entry of a type, converting dictionary entries to registry entries.
+
+        A dictionary entry only needs the "type" and "list" keys, the sort keys and exact index are derived if missing.
+
+        Args:
+            key: The name of the type.
+            value: The entry of the type.
+        """
+        if not isinstance(value, VersionRegistryEntry):
+            versions = value["list"]
+            keys = value.get("keys", None)
+            if keys is None:
+                keys = [self.get_item_key(self.dereference(item)) for item in versions]
+            exact = value.get("exact", None)
+            if exact is None:
+                exact = self.create_exact(keys, versions)
+            value = VersionRegistryEntry(value["type"], versions, keys, exact)
+        self.data[key] = value
+        self.dispatch_cache.invalidate(key)
+
+    # Static Methods
+    @staticmethod
+    def get_item_key(item: Any) -> tuple:
+        """Gets the sort key of a versioned object which is the tuple of its version.
+
+        Args:
+            item: The versioned object or version to get the sort key of.
+
+        Returns:
+            The sort key of the versioned object.
+        """
+        if isinstance(item, Version):
+            return item.tuple()
+        key = getattr(item, "_VERSION_KEY", None)
+        return item.VERSION.tuple() if key is None else key
+
+    @staticmethod
+    def get_import_path(obj: Any) -> str | None:
+        """Gets the import path of an object in the form "module:qualname".
+
+        Args:
+            obj: The object to get the import path of.
+
+        Returns:
+            The import path or None if the object cannot be imported by its path.
+        """
+        if isinstance(obj, LazyVersionedItem):
+            return obj.path
+        qualname = getattr(obj, "__qualname__", "<locals>")
+        if "<locals>" in qualname:
+            return None
+        return f"{obj.__module__}:{qualname}"
+
+    @staticmethod
+    def is_collected(item: Any) -> bool:
+        """Checks if an item of an entry is a weak reference to an object which has been garbage collected.
+
+        Args:
+            item: The item to check.
+
+        Returns:
+            True if the item's object has been collected.
+        """
+        return isinstance(item, weakref.ref) and item() is None
+
+    @staticmethod
+    def dereference(item: Any) -> Any:
+        """Gets the object of an item of an entry, which is the referent if the item is a weak reference.
+
+        Args:
+            item: The item to get the object of.
+
+        Returns:
+            The object of the item or None if the item's object has been collected.
+        """
+        return item() if isinstance(item, weakref.ref) else item
+
+    @staticmethod
+    def get_series_bounds(key: tuple, depth: int = 1) -> tuple[tuple, tuple]:
+        """Gets the sort keys which bound the versions that share the leading numbers of a sort key.
+
+        Args:
+            key: The sort key to get the bounds of.
+            depth: The number of leading numbers which are shared.
+
+        Returns:
+            The inclusive lower bound and the exclusive upper bound.
+
+        Raises:
+            ValueError: If the depth is less than one or more than the length of the sort key.
+        """
+        if not 0 < depth <= len(key):
+            raise ValueError(f"The depth must be between 1 and {len(key)} for the version {key}, not {depth}.")
+        prefix = tuple(key[:depth])
+        return prefix, prefix[:-1] + (prefix[-1] + 1,)
+
+    @staticmethod
+    def create_exact(keys: Iterable[tuple], items: Iterable[Any]) -> dict[tuple, Any]:
+        """Creates an exact index which maps sort keys to the first item with that key.
+
+        Args:
+            keys: The sort keys of the items in order.
+            items: The items in order.
+
+        Returns:
+            The exact index.
+        """
+        exact = {}
+        for key, item in zip(keys, items):
+            exact.setdefault(key, item)
+        return exact
+
     # Instance Methods
+    def create_key(self, type_: str | VersionType, key: Version | Iterable[int] | str | int) -> tuple:
+        """Creates a sort key from a version key, so it can be compared against the sort keys of a type.
+
+        Args:
+            type_: The type of versioned object the key is for.
+            key: The version key to create a sort key from.
+
+        Returns:
+            The sort key of the version key.
+        """
+        if isinstance(key, Version):
+            return key.tuple()
+        elif hasattr(key, "VERSION"):
+            return self.get_item_key(key)
+        else:
+            if isinstance(type_, VersionType):
+                type_ = type_.name
+            return version_intern_cache.get_version(self.get_version_type(type_), key).tuple()
+
     def get_version(
         self,
         type_: str | VersionType,
@@ -55,25 +279,112 @@ class VersionRegistry(UserDict):
             obj: The versioned object.
 
         Raises
-            ValueError: If there is no closest version.
+            ValueError: If there is no closest version or no exact version when exact is True.
         """
         if isinstance(type_, VersionType):
             type_ = type_.name
 
-        versions = self.data[type_]["list"]
-        if isinstance(key, str) or isinstance(key, list) or isinstance(key, tuple):
-            version_class = self.data[type_]["type"].class_
-            key = version_class.cast(key)
-
-        if exact:
-            index = versions.index(key)
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            item = self._search(type_, self.create_key(type_, key), key, exact)
         else:
-            index = bisect.bisect(versions, key) - 1
+            instrumentation.count(type_, "lookup")
+            search_key = instrumentation.measure(type_, "cast", self.create_key, type_, key)
+            item = instrumentation.measure(type_, "search", self._search, type_, search_key, key, exact)
+        return self.resolve_item(type_, item)
+
+    def get_versions(
+        self,
+        type_: str | VersionType,
+        keys: Iterable[Version | Iterable[int] | str] | Any,
+        exact: bool = False,
+        indices: bool = False,
+    ) -> Any:
+        """Gets the objects of many version keys at once by searching the packed sort keys of a type with NumPy.
 
-        if index < 0:
-            raise ValueError(f"Version needs to be greater than {str(versions[0])}, {str(key)} is not.")
+        Each distinct version key is cast once, then all the keys are packed into integers and found with a single
+        search of the type's packed sort keys. A two-dimensional integer array is treated as rows of sort keys and is
+        packed without casting. When the keys cannot be packed into 64 bits, each key is searched for with bisect
+        instead. The results are the same as calling get_version with each key.
+
+        Args:
+            type_: The type of versioned object to get.
+            keys: The version keys as a sequence or array of version strings, tuples, or versions.
+            exact: Determines whether the exact versions are needed or return the closest versions.
+            indices: Determines if the indices of the objects in the type's list are returned instead of the objects.
+
+        Returns:
+            An int array of the indices of the objects or an object array of the versioned objects.
+
+        Raises
+            ValueError: If a key has no closest version or no exact version when exact is True.
+        """
+        np = get_numpy()
+        if isinstance(type_, VersionType):
+            type_ = type_.name
+
+        if isinstance(keys, np.ndarray) and keys.dtype.kind in "iu" and keys.ndim == 2:
+            unique, inverse, search_keys = None, None, keys
         else:
-            return versions[index]
+            unique, inverse = get_unique_keys(keys)
+            search_keys = [self.create_key(type_, key) for key in unique]
+
+        while True:
+            entry = self.data[type_]
+            found = self._find_positions(type_, entry, search_keys, unique, exact)
+            if inverse is not None:
+                found = found[inverse]
+            if indices:
+                return found
+
+            objects = self._resolve_positions(type_, entry, found)
+            if objects is not None:
+                return objects
+            self.purge(type_)  # Objects were collected before their callbacks purged them, so purge and search again.
+
+    def get_version_cached(
+        self,
+        type_: str | VersionType,
+        key: Version | Iterable[int] | str | int,
+        exact: bool = False,
+    ) -> Any:
+        """Gets an object from the registry through the dispatch cache.
+
+        The cache is invalidated for a type whenever the versioned objects of that type are added to or sorted.
+
+        Args:
+            type_: The type of versioned object to get.
+            key: The key to search for the versioned object with.
+            exact: Determines whether the exact version is need or return the closest version.
+
+        Returns
+            obj: The versioned object.
+        """
+        if isinstance(type_, VersionType):
+            type_ = type_.name
+
+        if self.shared_indexes and type_ in self.shared_indexes:
+            self._check_shared_generation(type_)
+
+        cache_key = self.dispatch_cache.create_key(type_, key, exact)
+        if cache_key is None:
+            return self.get_version(type_, key, exact=exact)
+
+        item = self.dispatch_cache.get(cache_key, SENTINEL)
+        if item is not SENTINEL and self.weak:
+            item = item()
+            if item is None:
+                item = SENTINEL
+
+        if self.instrumentation is not None:
+            self.instrumentation.count(type_, "cache_miss" if item is SENTINEL else "cache_hit")
+
+        if item is SENTINEL:
+            # The generation is taken before the lookup, so a lookup which races a change is cached as stale.
+            generation = self.dispatch_cache.get_generation(type_)
+            item = self.get_version(type_, key, exact=exact)
+            self.dispatch_cache.set(cache_key, weakref.ref(item) if self.weak else item, generation)
+        return item
 
     def get_latest_version(self, type_: str | VersionType, default: Any = SENTINEL) -> Any:
         """Gets an object from the registry based on the type and the latest version of that object.
@@ -88,8 +399,151 @@ class VersionRegistry(UserDict):
         if isinstance(type_, VersionType):
             type_ = type_.name
 
-        versions = self.data.get(type_, {}).get("list", [])
-        return versions[-1] if versions or default is SENTINEL else default
+        while True:
+            entry = self.data.get(type_, None)
+            latest = None if entry is None else entry.latest
+            if latest is None:
+                break
+            elif not self.is_collected(latest):
+                return self.resolve_item(type_, latest)
+            self.purge(type_)
+
+        if default is SENTINEL:
+            raise IndexError(f"There are no versions of {type_} in the registry.")
+        return default
+
+    def iter_range(
+        self,
+        type_: str | VersionType,
+        lower: Version | Iterable[int] | str | None = None,
+        upper: Version | Iterable[int] | str | None = None,
+        include_lower: bool = True,
+        include_upper: bool = False,
+        predicate: Callable[[Any], bool] | None = None,
+        reverse: bool = False,
+    ) -> Iterator[Any]:
+        """Iterates over the objects of a type with versions in a range, which is found by bisecting the sort keys.
+
+        The iterator does not copy the entry, so a registry which is not thread safe should not be changed while the
+        iterator is in use.
+
+        Args:
+            type_: The type of versioned object to iterate over.
+            lower: The lower bound of the versions, None has no lower bound.
+            upper: The upper bound of the versions, None has no upper bound.
+            include_lower: Determines if objects with the lower bound version are included.
+            include_upper: Determines if objects with the upper bound version are included.
+            predicate: A function which an object must return True for to be included.
+            reverse: Determines if the objects are iterated over from newest to oldest.
+
+        Returns:
+            An iterator of the versioned objects in order by version.
+        """
+        if isinstance(type_, VersionType):
+            type_ = type_.name
+
+        lower = None if lower is None else self.create_key(type_, lower)
+        upper = None if upper is None else self.create_key(type_, upper)
+        for _, item in self._iter_range_items(type_, lower, upper, include_lower, include_upper, reverse):
+            item = self.resolve_item(type_, item)
+            if item is not None and (predicate is None or predicate(item)):
+                yield item
+
+    def get_next_version(
+        self,
+        type_: str | VersionType,
+        key: Version | Iterable[int] | str | int,
+        default: Any = SENTINEL,
+    ) -> Any:
+        """Gets the object with the oldest version that is newer than a version.
+
+        Args:
+            type_: The type of versioned object to get.
+            key: The version to get the next newer version of.
+            default: A default object to return if there is no newer version.
+
+        Returns:
+            obj: The versioned object.
+
+        Raises:
+            ValueError: If there is no newer version and no default.
+        """
+        item = next(self.iter_range(type_, lower=key, include_lower=False), default)
+        if item is SENTINEL:
+            raise ValueError(f"There is no version newer than {str(key)} in the registry.")
+        return item
+
+    def get_latest_compatible(
+        self,
+        type_: str | VersionType,
+        key: Version | Iterable[int] | str | int,
+        depth: int = 1,
+        default: Any = SENTINEL,
+    ) -> Any:
+        """Gets the object with the newest version which shares the leading numbers of a version, such as its major.
+
+        Args:
+            type_: The type of versioned object to get.
+            key: The version to get the newest compatible version of.
+            depth: The number of leading numbers of the version which must match.
+            default: A default object to return if there is no compatible version.
+
+        Returns:
+            obj: The versioned object.
+
+        Raises:
+            ValueError: If there is no compatible version and no default, or the depth is not within the version.
+        """
+        if isinstance(type_, VersionType):
+            type_ = type_.name
+
+        lower, upper = self.get_series_bounds(self.create_key(type_, key), depth)
+        items = self._iter_range_items(type_, lower, upper, True, False, True)
+        for _, item in items:
+            item = self.resolve_item(type_, item)
+            if item is not None:
+                return item
+
+        if default is SENTINEL:
+            raise ValueError(f"There is no version compatible with {str(key)} in the registry.")
+        return default
+
+    def get_compatibility_matrix(
+        self,
+        type_: str | VersionType,
+        keys: Iterable[Version | Iterable[int] | str] | None = None,
+        depth: int = 1,
+    ) -> dict[tuple, list[Any]]:
+        """Gets the objects which are compatible with each of several versions.
+
+        An object is compatible with a version if it shares the leading numbers of that version and its version is the
+        same or newer, so it can be used for objects of that version.
+
+        Args:
+            type_: The type of versioned object to get.
+            keys: The versions to get the compatible objects of, defaults to all the versions in the registry.
+            depth: The number of leading numbers of the versions which must match.
+
+        Returns:
+            The compatible objects in order by version, keyed by the sort key of each version.
+
+        Raises:
+            ValueError: If the depth is not within a version.
+        """
+        if isinstance(type_, VersionType):
+            type_ = type_.name
+
+        if keys is None:
+            search_keys = list(dict.fromkeys(key for key, _ in self._iter_range_items(type_, None, None)))
+        else:
+            search_keys = [self.create_key(type_, key) for key in keys]
+
+        matrix = {}
+        for search_key in search_keys:
+            upper = self.get_series_bounds(search_key, depth)[1]
+            items = (self.resolve_item(type_, item) for _, item in self._iter_range_items(type_, search_key, upper))
+            matrix[search_key] = [item for item in items if item is not None]
+        return matrix
 
     def get_version_type(self, name: str, default: Any = SENTINEL) -> VersionType:
         """Gets the type object being used as a key.
@@ -102,10 +556,10 @@ class VersionRegistry(UserDict):
             The type object requested.
         """
         if default is SENTINEL:
-            return self.data[name]["type"]
+            return self.data[name].version_type
         else:
             item = self.data.get(name, None)
-            return default if item is None else item["type"]
+            return default if item is None else item.version_type
 
     def add_item(self, item: Any, type_: VersionType | str | None = None) -> None:
         """Adds a versioned item into the registry.
@@ -114,30 +568,765 @@ class VersionRegistry(UserDict):
             item: The versioned object to add.
             type_: The type of versioned object to add.
         """
-        if isinstance(type_, str):
-            name = type_
-            type_ = self.data[name]["type"]
-        else:
-            if type_ is None:
-                type_ = item.version_type
-            name = type_.name
+        pending = getattr(self._bulk, "pending", None)
+        if pending is not None:
+            pending.append((item, type_))
+            return
+
+        type_ = self._get_item_type(item, type_)
+        name = type_.name
+        key = self.get_item_key(item)
+        item = self._store_item(name, item)
+        with self._lock:
+            self._purge_collected()
+            entry = self._get_writable_entry(name)
+            if entry is None:
+                entry = VersionRegistryEntry(type_, [item], [key], {key: item})
+            else:
+                # Adopts the type of the version head when the entry was loaded from an index.
+                if entry.version_type.head_class is None and type_.head_class is not None:
+                    entry.version_type = type_
+
+                lazy_item = entry.exact.get(key, None)
+                if isinstance(lazy_item, LazyVersionedItem) and not isinstance(item, LazyVersionedItem):
+                    self._replace_item(entry, key, lazy_item, item)
+                elif isinstance(entry, SharedVersionRegistryEntry):
+                    entry.exact.setdefault(key, item)  # The shared index keeps the order, so nothing is sorted.
+                else:
+                    index = bisect.bisect(entry.sort_keys, key)
+                    entry.versions.insert(index, item)
+                    entry.sort_keys.insert(index, key)
+                    entry.exact.setdefault(key, item)
+            self._publish_entry(name, entry)
 
-        if name in self.data:
-            bisect.insort(self.data[name]["list"], item)
+    def add_items(self, items: Iterable[Any], type_: VersionType | str | None = None) -> None:
+        """Adds many versioned items into the registry, sorting and indexing each entry once after all are added.
+
+        Args:
+            items: The versioned objects to add.
+            type_: The type of versioned objects to add, defaults to the type of each object.
+        """
+        items = ((item, type_) for item in items)
+        pending = getattr(self._bulk, "pending", None)
+        if pending is not None:
+            pending.extend(items)
         else:
-            self.data[name] = {"type": type_, "list": [item]}
+            self._add_pairs(items)
+
+    @contextmanager
+    def bulk_load(self) -> Generator["VersionRegistry", None, None]:
+        """A context manager which defers the objects added within it and adds them all at once when it exits.
+
+        This is used around importing or creating many versioned classes, since their registration does not have to
+        insert each class into a sorted entry. The deferred objects cannot be looked up until the context exits.
+
+        Only the objects added by the thread which entered the bulk load are deferred, other threads keep adding their
+        objects immediately.
+
+        Returns:
+            This registry.
+        """
+        bulk = self._bulk
+        if getattr(bulk, "pending", None) is not None:
+            yield self  # An outer bulk load adds the objects when it exits.
+            return
+
+        bulk.pending = pending = []
+        try:
+            yield self
+        finally:
+            bulk.pending = None
+            self._add_pairs(pending)
+
+    def add_lazy_item(self, type_: VersionType | str, version: Version | str | tuple, path: str) -> LazyVersionedItem:
+        """Adds a versioned object by its version and import path, so it is only imported when a lookup selects it.
+
+        Args:
+            type_: The type of versioned object to add.
+            version: The version of the versioned object.
+            path: The import path of the versioned object, either "module:qualname" or "module.name".
+
+        Returns:
+            The placeholder which was added or the versioned object if it is already registered.
+        """
+        if isinstance(type_, str):
+            type_ = self.get_version_type(type_)
+
+        lazy_item = LazyVersionedItem(type_, version, path)
+        entry = self.data.get(type_.name, None)
+        if entry is not None and lazy_item._VERSION_KEY in entry.exact:
+            return self.dereference(entry.exact[lazy_item._VERSION_KEY])
+
+        self.add_item(lazy_item, type_)
+        return lazy_item
+
+    def add_entry_points(self, type_: VersionType | str, group: str | None = None) -> list[LazyVersionedItem]:
+        """Adds versioned objects lazily from the entry points of installed packages.
+
+        The name of each entry point is the version of the object and the value is its import path.
+
+        Args:
+            type_: The type of versioned object to add.
+            group: The entry point group to add, defaults to "classversioning." followed by the name of the type.
+
+        Returns:
+            The placeholders or versioned objects of the entry points.
+        """
+        if group is None:
+            group = f"classversioning.{type_.name if isinstance(type_, VersionType) else type_}"
+        # Importing the metadata is slow, so it is only imported when entry points are registered.
+        from importlib.metadata import entry_points
+
+        return [self.add_lazy_item(type_, point.name, point.value) for point in entry_points(group=group)]
+
+    def export_index(self, path: str | os.PathLike, types: Iterable[str] | None = None) -> None:
+        """Exports the sorted index of the registry to a file which can be loaded as lazy placeholders.
+
+        The index contains the import path of the version class of each type, and the version key and import path of
+        each versioned object. Objects which cannot be imported by their path, such as ones defined within functions,
+        are left out.
+
+        Args:
+            path: The path of the file to export to.
+            types: The names of the types to export, None exports all types.
+        """
+        index = {}
+        for name in self.data if types is None else types:
+            entry = self.data[name]
+            versions = []
+            for key, item in zip(entry.sort_keys, entry.versions):
+                item = self.dereference(item)
+                item_path = None if item is None else self.get_import_path(item)
+                if item_path is not None:
+                    versions.append([list(key), item_path])
+            index[name] = {"class": self.get_import_path(entry.version_type.class_), "versions": versions}
+
+        with open(path, "w") as file:
+            json.dump({"format": 1, "types": index}, file, separators=(",", ":"))
+
+    def load_index(self, path: str | os.PathLike) -> None:
+        """Loads an exported index into the registry as lazy placeholders.
+
+        Types which are not in the registry are created from the index with their already sorted versions, so they
+        are not sorted again. The version head adopts the type when it is imported.
+
+        Args:
+            path: The path of the file to load.
+        """
+        with open(path) as file:
+            index = json.load(file)["types"]
+
+        for name, type_index in index.items():
+            entry = self.data.get(name, None)
+            if entry is not None:
+                for key, item_path in type_index["versions"]:
+                    self.add_lazy_item(name, tuple(key), item_path)
+                continue
+
+            class_ = LazyVersionedItem.import_object(type_index["class"])
+            type_ = VersionType(name=name, class_=class_)
+            versions = [LazyVersionedItem(type_, tuple(key), item_path) for key, item_path in type_index["versions"]]
+            keys = [item._VERSION_KEY for item in versions]
+            entry = VersionRegistryEntry(type_, versions, keys, self.create_exact(keys, versions))
+            with self._lock:
+                self._publish_entry(name, entry)
+
+    def resolve_item(self, type_: str | VersionType, item: Any) -> Any:
+        """Gets the versioned object an item stands for, importing it if the item is a lazy placeholder.
+
+        Args:
+            type_: The type of versioned object the item is.
+            item: The item to resolve.
+
+        Returns:
+            The versioned object.
+        """
+        if isinstance(item, weakref.ref):
+            return item()
+        elif not isinstance(item, LazyVersionedItem):
+            return item
+
+        if isinstance(type_, VersionType):
+            type_ = type_.name
+
+        loaded = item.load()  # Importing normally registers the object which replaces the placeholder.
+        with self._lock:
+            if self.data[type_].exact.get(item._VERSION_KEY, None) is item:
+                entry = self._get_writable_entry(type_)
+                self._replace_item(entry, item._VERSION_KEY, item, self._store_item(type_, loaded))
+                self._publish_entry(type_, entry)
+        return loaded
+
+    def publish_shared_index(
+        self,
+        type_: str | VersionType,
+        capacity: int | None = None,
+        name: str | None = None,
+    ) -> SharedVersionIndex:
+        """Publishes the sort keys of a type to a new shared memory index, which is updated whenever the type changes.
+
+        Processes forked after publishing read the index automatically, other processes can attach to it by name. The
+        publishing process owns the shared memory and should close it with unpublish_shared_index.
+
+        Args:
+            type_: The type of versioned object to publish the sort keys of.
+            capacity: The maximum number of sort keys the index can hold, defaults to double the current number.
+            name: The name of the shared memory, None uses a random name.
+
+        Returns:
+            The shared index.
+        """
+        if isinstance(type_, VersionType):
+            type_ = type_.name
+
+        with self._lock:
+            keys = self.data[type_].sort_keys
+            index = SharedVersionIndex(name, capacity=max(2 * len(keys), 64) if capacity is None else capacity)
+            index.publish(keys)
+            self.shared_indexes[type_] = index
+            self._shared_publishers[type_] = os.getpid()
+            self._shared_generations[type_] = index.generation
+        return index
+
+    def attach_shared_index(self, type_: str | VersionType, index: SharedVersionIndex | str) -> SharedVersionIndex:
+        """Attaches a shared memory index which another process publishes the sort keys of a type to.
+
+        Args:
+            type_: The type of versioned object the index has the sort keys of.
+            index: The shared index or the name of its shared memory.
+
+        Returns:
+            The shared index.
+        """
+        if isinstance(type_, VersionType):
+            type_ = type_.name
+        if isinstance(index, str):
+            index = SharedVersionIndex.attach(index)
+
+        with self._lock:
+            self.shared_indexes[type_] = index
+            self._shared_publishers.pop(type_, None)
+            self._read_shared_index(type_, index)
+        return index
+
+    def unpublish_shared_index(self, type_: str | VersionType) -> None:
+        """Stops using the shared index of a type, unlinking it if this process published it.
+
+        Args:
+            type_: The type of versioned object to stop using the shared index of.
+        """
+        if isinstance(type_, VersionType):
+            type_ = type_.name
+
+        with self._lock:
+            index = self.shared_indexes.pop(type_)
+            self._shared_generations.pop(type_, None)
+            publisher = self._shared_publishers.pop(type_, None)
+            entry = self.data.get(type_, None)
+            if isinstance(entry, SharedVersionRegistryEntry):
+                keys = entry.sort_keys
+                versions = [entry.exact[key] for key in keys]
+                entry = VersionRegistryEntry(entry.version_type, versions, keys, entry.exact.copy())
+                self._publish_entry(type_, entry)
+            else:
+                self.dispatch_cache.invalidate(type_)
+
+        index.close()
+        if publisher == os.getpid():
+            index.unlink()
+
+    def is_shared_reader(self, type_: str) -> bool:
+        """Checks if this process reads the shared index of a type rather than publishes it.
+
+        Args:
+            type_: The name of the type of versioned object.
+
+        Returns:
+            True if the type has a shared index which another process publishes.
+        """
+        return type_ in self.shared_indexes and self._shared_publishers.get(type_, None) != os.getpid()
+
+    def enable_instrumentation(self, instrumentation: DispatchInstrumentation | None = None) -> DispatchInstrumentation:
+        """Enables the instrumentation of the lookups and dispatches which use this registry.
+
+        Args:
+            instrumentation: The instrumentation to use, defaults to the current one or a new one.
+
+        Returns:
+            The instrumentation which was enabled.
+        """
+        if instrumentation is None:
+            instrumentation = self.instrumentation or DispatchInstrumentation()
+        self.instrumentation = instrumentation
+        return instrumentation
+
+    def disable_instrumentation(self) -> DispatchInstrumentation | None:
+        """Disables the instrumentation of this registry.
+
+        Returns:
+            The instrumentation which was disabled, so its counts and timings can still be read.
+        """
+        instrumentation, self.instrumentation = self.instrumentation, None
+        return instrumentation
+
+    def purge(self, type_: str | VersionType | None = None) -> None:
+        """Removes the items of objects which have been garbage collected from the registry.
+
+        Args:
+            type_: The type of versioned object to purge, None purges all types.
+        """
+        if isinstance(type_, VersionType):
+            type_ = type_.name
+
+        with self._lock:
+            for name in list(self.data) if type_ is None else (type_,):
+                self._purge_entry(name)
+
+    def _replace_item(self, entry: VersionRegistryEntry, key: tuple, old: Any, new: Any) -> None:
+        """Replaces an item of an entry with another item which has the same sort key.
+
+        Args:
+            entry: The entry to replace the item in.
+            key: The sort key of the items.
+            old: The item to replace.
+            new: The item to replace it with.
+        """
+        if not isinstance(entry, SharedVersionRegistryEntry):
+            versions = entry.versions
+            index = bisect.bisect_left(entry.sort_keys, key)
+            while versions[index] is not old:
+                index += 1
+            versions[index] = new
+        if entry.exact[key] is old:
+            entry.exact[key] = new
 
     def sort(self, type_: str | None = None, **kwargs: Any) -> None:
-        """Sorts the registry.
+        """Sorts the registry and rebuilds the sort keys and exact indices.
 
         Args:
             type_: The type of versioned object to add.
             **kwargs: Keyword arguments that are passed to the list sort function.
         """
-        if type_ is None:
-            for versions in self.data.values():
-                versions["list"].sort(**kwargs)
+        if isinstance(type_, VersionType):
+            type_ = type_.name
+
+        with self._lock:
+            self._purge_collected()
+            for name in list(self.data) if type_ is None else (type_,):
+                entry = self._get_writable_entry(name)
+                self._sort_entry(entry, **kwargs)
+                self._publish_entry(name, entry)
+
+    def _get_writable_entry(self, name: str) -> VersionRegistryEntry | None:
+        """Gets an entry which can be changed, a copy of the entry when the registry is thread safe.
+
+        Args:
+            name: The name of the type of the entry.
+
+        Returns:
+            The entry which can be changed or None if there is no entry.
+        """
+        entry = self.data.get(name, None)
+        if entry is not None and self.thread_safe:
+            entry = entry.copy()
+        return entry
+
+    def _publish_entry(self, name: str, entry: VersionRegistryEntry) -> None:
+        """Publishes a changed entry and invalidates the lookups cached from the previous entry.
+
+        Args:
+            name: The name of the type of the entry.
+            entry: The changed entry.
+        """
+        self.data[name] = entry
+        self.dispatch_cache.invalidate(name)
+        if self._shared_publishers.get(name, None) == os.getpid():
+            index = self.shared_indexes[name]
+            try:
+                index.publish(entry.sort_keys)
+            except ValueError as error:
+                # An invalid index makes the readers search their own entries rather than a stale index.
+                index.invalidate()
+                warnings.warn(f"The shared index of {name} was invalidated: {error}", RuntimeWarning)
+
+    def _search(self, type_: str, search_key: tuple, key: Any, exact: bool) -> Any:
+        """Searches an entry for the item of a sort key, purging collected objects that the search lands on.
+
+        Args:
+            type_: The name of the type of versioned object to search for.
+            search_key: The sort key to search with.
+            key: The version key the sort key was created from.
+            exact: Determines whether the exact version is need or return the closest version.
+
+        Returns:
+            The item found, which may be a weak reference or a lazy placeholder.
+
+        Raises
+            ValueError: If there is no closest version or no exact version when exact is True.
+        """
+        while True:
+            entry = self._get_search_entry(type_)
+            if exact:
+                item = entry.exact.get(search_key, SENTINEL)
+                if item is SENTINEL:
+                    raise ValueError(f"{str(key)} is not in the registry.")
+            elif isinstance(entry, SharedVersionRegistryEntry):
+                item = entry.find(search_key)
+                if item is None:
+                    first = self.dereference(entry.versions[0])
+                    raise ValueError(f"Version needs to be greater than {str(first)}, {str(key)} is not.")
+            else:
+                index = bisect.bisect(entry.sort_keys, search_key) - 1
+                if index < 0:
+                    first = self.dereference(entry.versions[0])
+                    raise ValueError(f"Version needs to be greater than {str(first)}, {str(key)} is not.")
+                item = entry.versions[index]
+
+            if not self.is_collected(item):
+                return item
+            self.purge(type_)  # The object was collected before its callback purged it, so purge and search again.
+
+    def _iter_range_items(
+        self,
+        type_: str,
+        lower: tuple | None,
+        upper: tuple | None,
+        include_lower: bool = True,
+        include_upper: bool = False,
+        reverse: bool = False,
+    ) -> Iterator[tuple[tuple, Any]]:
+        """Iterates over the sort keys and items of an entry between two sort keys without copying the entry.
+
+        Args:
+            type_: The name of the type of versioned object to iterate over.
+            lower: The lower bound sort key, None has no lower bound.
+            upper: The upper bound sort key, None has no upper bound.
+            include_lower: Determines if items with the lower bound key are included.
+            include_upper: Determines if items with the upper bound key are included.
+            reverse: Determines if the items are iterated over from newest to oldest.
+
+        Returns:
+            An iterator of the sort keys and items, the items may be weak references or lazy placeholders.
+        """
+        entry = self.data[type_]
+        keys = entry.sort_keys
+        versions = entry.versions
+        if lower is None:
+            start = 0
         else:
-            if isinstance(type_, VersionType):
-                type_ = type_.name
-            self.data[type_]["list"].sort(**kwargs)
+            start = (bisect.bisect_left if include_lower else bisect.bisect_right)(keys, lower)
+        if upper is None:
+            stop = len(keys)
+        else:
+            stop = (bisect.bisect_right if include_upper else bisect.bisect_left)(keys, upper)
+
+        indices = range(stop - 1, start - 1, -1) if reverse else range(start, stop)
+        return ((keys[i], versions[i]) for i in indices)
+
+    def _get_item_type(self, item: Any, type_: VersionType | str | None = None) -> VersionType:
+        """Gets the type an object is added to the registry as.
+
+        Args:
+            item: The versioned object being added.
+            type_: The type given for the object, a type name, or None to use the type of the object.
+
+        Returns:
+            The type of the object.
+        """
+        if isinstance(type_, str):
+            return self.get_version_type(type_)
+        elif type_ is None:
+            return item.version_type
+        else:
+            return type_
+
+    def _add_pairs(self, pairs: Iterable[tuple[Any, VersionType | str | None]]) -> None:
+        """Appends objects to the entries of their types, then sorts and publishes each changed entry once.
+
+        Args:
+            pairs: The objects to add and the types given for them.
+        """
+        groups = {}
+        for item, type_ in pairs:
+            type_ = self._get_item_type(item, type_)
+            groups.setdefault(type_.name, (type_, []))[1].append(item)
+
+        with self._lock:
+            self._purge_collected()
+            for name, (type_, group) in groups.items():
+                entry = self._get_writable_entry(name)
+                if entry is None:
+                    entry = VersionRegistryEntry(type_)
+                elif entry.version_type.head_class is None and type_.head_class is not None:
+                    entry.version_type = type_
+
+                for item in group:
+                    key = self.get_item_key(item)
+                    stored = self._store_item(name, item)
+                    lazy_item = entry.exact.get(key, None)
+                    if isinstance(lazy_item, LazyVersionedItem) and not isinstance(item, LazyVersionedItem):
+                        self._replace_item(entry, key, lazy_item, stored)
+                    elif isinstance(entry, SharedVersionRegistryEntry):
+                        entry.exact.setdefault(key, stored)
+                    else:
+                        entry.versions.append(stored)
+                self._sort_entry(entry)
+                self._publish_entry(name, entry)
+
+    def _get_packed_keys(self, type_: str, entry: VersionRegistryEntry, search_keys: Any) -> tuple[Any, Any] | None:
+        """Packs the sort keys of an entry and the keys searched for, the entry's keys are cached until it changes.
+
+        Args:
+            type_: The name of the type of the entry.
+            entry: The entry to get the packed sort keys of.
+            search_keys: The sort keys searched for as a list of tuples or a two-dimensional integer array.
+
+        Returns:
+            The packed sort keys of the entry and of the keys searched for, or None if they cannot be packed.
+        """
+        np = get_numpy()
+        generation = self.dispatch_cache.get_generation(type_)
+        cached = self._packed_keys.get(type_, None)
+        if cached is None or cached[0] is not entry or cached[1] != generation:
+            cached = (entry, generation, max(map(len, entry.sort_keys), default=0), None)
+
+        search_width = search_keys.shape[1] if isinstance(search_keys, np.ndarray) else max(map(len, search_keys))
+        width = max(cached[2], search_width)
+        try:
+            if cached[3] is None or cached[3][0] != width:
+                matrix, lengths = get_key_matrix(entry.sort_keys, width)
+                columns = get_key_columns(matrix, lengths)
+                cached = cached[:3] + ((width, columns, pack_ranked_keys(matrix, lengths, columns)),)
+                self._packed_keys[type_] = cached
+            columns, packed = cached[3][1:]
+            return packed, pack_ranked_keys(*get_key_matrix(search_keys, width), columns)
+        except (TypeError, ValueError):
+            return None
+
+    def _find_positions(
+        self,
+        type_: str,
+        entry: VersionRegistryEntry,
+        search_keys: Any,
+        unique: list[Any] | None,
+        exact: bool,
+    ) -> Any:
+        """Finds the positions of the items of many sort keys in an entry, searching the packed keys when possible.
+
+        Args:
+            type_: The name of the type of the entry.
+            entry: The entry to search.
+            search_keys: The sort keys to search for as a list of tuples or a two-dimensional integer array.
+            unique: The version keys the sort keys were created from, None if the sort keys were given.
+            exact: Determines whether the exact versions are needed or return the closest versions.
+
+        Returns:
+            An int array of the positions of the items.
+
+        Raises:
+            ValueError: If a key has no closest version or no exact version when exact is True.
+        """
+        packed = self._get_packed_keys(type_, entry, search_keys) if len(search_keys) else None
+        if packed is None:
+            found, invalid = self._bisect_positions(entry, search_keys, exact)
+        else:
+            found, invalid = self._search_packed_positions(*packed, exact)
+
+        if invalid.any():
+            first = int(invalid.argmax())
+            key = tuple(search_keys[first].tolist()) if unique is None else unique[first]
+            if exact:
+                raise ValueError(f"{str(key)} is not in the registry.")
+            first_item = self.dereference(entry.versions[0])
+            raise ValueError(f"Version needs to be greater than {str(first_item)}, {str(key)} is not.")
+        return found
+
+    @staticmethod
+    def _search_packed_positions(registered: Any, searched: Any, exact: bool) -> tuple[Any, Any]:
+        """Finds the positions of packed sort keys in the packed sort keys of an entry with a single search.
+
+        Args:
+            registered: The packed sort keys of the entry.
+            searched: The packed sort keys to search for.
+            exact: Determines whether the exact versions are needed or return the closest versions.
+
+        Returns:
+            An int array of the positions and a bool array of which keys do not have a position.
+        """
+        np = get_numpy()
+        if not exact:
+            found = np.searchsorted(registered, searched, side="right") - 1
+            return found, found < 0
+
+        found = np.searchsorted(registered, searched, side="left")
+        invalid = found >= len(registered)
+        invalid[~invalid] = registered[found[~invalid]] != searched[~invalid]
+        return found, invalid
+
+    @staticmethod
+    def _bisect_positions(entry: VersionRegistryEntry, search_keys: Any, exact: bool) -> tuple[Any, Any]:
+        """Finds the positions of sort keys in an entry by bisecting for each key, for keys which cannot be packed.
+
+        Args:
+            entry: The entry to search.
+            search_keys: The sort keys to search for as a list of tuples or a two-dimensional integer array.
+            exact: Determines whether the exact versions are needed or return the closest versions.
+
+        Returns:
+            An int array of the positions and a bool array of which keys do not have a position.
+        """
+        np = get_numpy()
+        sort_keys = entry.sort_keys
+        rows = [tuple(key) for key in (search_keys.tolist() if isinstance(search_keys, np.ndarray) else search_keys)]
+        if not exact:
+            found = np.array([bisect.bisect_right(sort_keys, key) - 1 for key in rows], dtype=np.intp)
+            return found, found < 0
+
+        positions = [bisect.bisect_left(sort_keys, key) for key in rows]
+        invalid = [i >= len(sort_keys) or sort_keys[i] != key for i, key in zip(positions, rows)]
+        return np.array(positions, dtype=np.intp), np.array(invalid, dtype=bool)
+
+    def _resolve_positions(self, type_: str, entry: VersionRegistryEntry, found: Any) -> Any:
+        """Resolves the items at positions of an entry, resolving each distinct item only once.
+
+        Args:
+            type_: The name of the type of the entry.
+            entry: The entry to resolve the items of.
+            found: The int array of the positions of the items.
+
+        Returns:
+            An object array of the versioned objects, or None if an object was garbage collected.
+        """
+        np = get_numpy()
+        positions, position_inverse = np.unique(found, return_inverse=True)
+        objects = np.empty(len(positions), dtype=object)
+        for i, position in enumerate(positions.tolist()):
+            objects[i] = self.resolve_item(type_, entry.versions[position])
+        if self.weak and any(obj is None for obj in objects):
+            return None
+        return objects[position_inverse.reshape(-1)]
+
+    def _get_search_entry(self, type_: str) -> VersionRegistryEntry:
+        """Gets the entry of a type to search, which reads the shared index if this process is a reader of it.
+
+        A process forked from the publisher has the full entry, which is replaced the first time it is searched.
+
+        Args:
+            type_: The name of the type of versioned object to search for.
+
+        Returns:
+            The entry to search.
+        """
+        entry = self.data[type_]
+        if self.shared_indexes and not isinstance(entry, SharedVersionRegistryEntry) and self.is_shared_reader(type_):
+            with self._lock:
+                entry = self._read_shared_index(type_, self.shared_indexes[type_])
+        return entry
+
+    def _read_shared_index(self, type_: str, index: SharedVersionIndex) -> VersionRegistryEntry:
+        """Replaces the entry of a type with one which only keeps its exact index and searches a shared index.
+
+        Args:
+            type_: The name of the type of the entry.
+            index: The shared index to search.
+
+        Returns:
+            The entry which reads the shared index.
+        """
+        entry = self.data[type_]
+        if not isinstance(entry, SharedVersionRegistryEntry):
+            entry = SharedVersionRegistryEntry(entry.version_type, index, entry.exact.copy())
+            self._publish_entry(type_, entry)
+        return entry
+
+    def _check_shared_generation(self, type_: str) -> None:
+        """Invalidates the cached lookups of a type if its shared index has been updated by another process.
+
+        Args:
+            type_: The name of the type of versioned object.
+        """
+        generation = self.shared_indexes[type_].generation
+        if generation != self._shared_generations.get(type_, None):
+            self._shared_generations[type_] = generation
+            self.dispatch_cache.invalidate(type_)
+
+    def _store_item(self, name: str, item: Any) -> Any:
+        """Creates the item stored in an entry for an object, which is a weak reference if the registry is weak.
+
+        Args:
+            name: The name of the type of the object.
+            item: The object to store.
+
+        Returns:
+            The item to store in the entry.
+        """
+        if self.weak and not isinstance(item, LazyVersionedItem):
+            return weakref.ref(item, partial(self._item_collected, name))
+        return item
+
+    def _item_collected(self, name: str, reference: weakref.ref) -> None:
+        """Purges the entry of an object which was garbage collected, or defers it if the registry is being changed.
+
+        Args:
+            name: The name of the type of the object.
+            reference: The weak reference to the collected object.
+        """
+        self._collected.add(name)
+        if self._lock.acquire(blocking=False):
+            try:
+                self._purge_collected()
+            finally:
+                self._lock.release()
+
+    def _purge_collected(self) -> None:
+        """Purges the entries which have had objects collected, the lock must be held."""
+        while self._collected:
+            self._purge_entry(self._collected.pop())
+
+    def _purge_entry(self, name: str) -> None:
+        """Publishes a new entry without the items of collected objects, the lock must be held.
+
+        Entries are always replaced rather than changed, so lookups which are in progress keep a consistent entry.
+
+        Args:
+            name: The name of the type of the entry to purge.
+        """
+        entry = self.data.get(name, None)
+        if isinstance(entry, SharedVersionRegistryEntry):
+            exact = {key: item for key, item in entry.exact.items() if not self.is_collected(item)}
+            if len(exact) < len(entry.exact):
+                self._publish_entry(name, SharedVersionRegistryEntry(entry.version_type, entry.index, exact))
+            return
+        elif entry is None or not any(self.is_collected(item) for item in entry.versions):
+            return
+
+        pairs = [(key, item) for key, item in zip(entry.sort_keys, entry.versions) if not self.is_collected(item)]
+        keys = [key for key, _ in pairs]
+        versions = [item for _, item in pairs]
+        entry = VersionRegistryEntry(entry.version_type, versions, keys, self.create_exact(keys, versions))
+        self._publish_entry(name, entry)
+
+    def _sort_entry(self, entry: VersionRegistryEntry, key: Any = None, **kwargs: Any) -> None:
+        """Sorts the list of an entry of the registry and rebuilds its sort keys and exact index.
+
+        The items of collected objects are dropped and a key function is given the objects rather than their items.
+
+        Args:
+            entry: The entry to sort.
+            key: The key function to sort by, defaults to the sort keys of the objects.
+            **kwargs: Keyword arguments that are passed to the list sort function.
+        """
+        if isinstance(entry, SharedVersionRegistryEntry):
+            entry.exact = {key: item for key, item in entry.exact.items() if not self.is_collected(item)}
+            return
+
+        triples = []
+        for item in entry.versions:
+            obj = self.dereference(item)
+            if obj is not None:
+                triples.append((self.get_item_key(obj), item, obj))
+
+        triples.sort(key=itemgetter(0) if key is None else (lambda triple: key(triple[2])), **kwargs)
+        entry.versions[:] = [item for _, item, _ in triples]
+        entry.sort_keys = keys = [sort_key for sort_key, _, _ in triples]
+        entry.exact = self.create_exact(keys, entry.versions)
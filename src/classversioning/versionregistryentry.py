@@ -0,0 +1,112 @@
+"""versionregistryentry.py
+A compact entry of a VersionRegistry which holds the versioned objects of one type and the indices derived from them.
+"""
+# Package Header #
+from .header import *
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+# Third-Party Packages #
+from baseobjects.versioning import VersionType
+
+# Local Packages #
+
+
+# Definitions #
+# Classes #
+class VersionRegistryEntry(Mapping):
+    """A compact entry of a VersionRegistry which holds the versioned objects of one type and their indices.
+
+    The entry stores its fields in slots, so it is smaller than a dictionary and the registry reaches the fields with
+    attribute lookups. The fields can still be accessed like the dictionaries entries used to be, with the "type",
+    "list", "keys", and "exact" keys.
+
+    Attributes:
+        version_type: The type of the versioned objects.
+        versions: The versioned objects in order by version.
+        sort_keys: The sort keys of the versioned objects, parallel to the versioned objects.
+        exact: The first versioned object of each sort key.
+
+    Args:
+        version_type: The type of the versioned objects.
+        versions: The versioned objects in order by version.
+        sort_keys: The sort keys of the versioned objects, parallel to the versioned objects.
+        exact: The first versioned object of each sort key.
+    """
+
+    __slots__ = ("version_type", "versions", "sort_keys", "exact")
+    field_names: dict[str, str] = {"type": "version_type", "list": "versions", "keys": "sort_keys", "exact": "exact"}
+
+    # Properties #
+    @property
+    def latest(self) -> Any:
+        """The item with the latest version or None if the entry is empty."""
+        return self.versions[-1] if self.versions else None
+
+    # Magic Methods
+    # Construction/Destruction
+    def __init__(
+        self,
+        version_type: VersionType,
+        versions: list[Any] | None = None,
+        sort_keys: list[tuple] | None = None,
+        exact: dict[tuple, Any] | None = None,
+    ) -> None:
+        # New Attributes #
+        self.version_type: VersionType = version_type
+        self.versions: list[Any] = [] if versions is None else versions
+        self.sort_keys: list[tuple] = [] if sort_keys is None else sort_keys
+        self.exact: dict[tuple, Any] = {} if exact is None else exact
+
+    # Representation
+    def __repr__(self) -> str:
+        """Creates a representation of the entry with its type and number of versioned objects."""
+        return f"{type(self).__name__}({self.version_type.name!r}, {len(self.versions)} versions)"
+
+    # Container Methods
+    def __getitem__(self, key: str) -> Any:
+        """Gets a field of the entry by its dictionary key.
+
+        Args:
+            key: The dictionary key of the field, "type", "list", "keys", or "exact".
+
+        Returns:
+            The field.
+        """
+        return getattr(self, self.field_names[key])
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        """Sets a field of the entry by its dictionary key.
+
+        Args:
+            key: The dictionary key of the field, "type", "list", "keys", or "exact".
+            value: The value of the field.
+        """
+        setattr(self, self.field_names[key], value)
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterates over the dictionary keys of the fields."""
+        return iter(self.field_names)
+
+    def __len__(self) -> int:
+        """Gets the number of fields."""
+        return len(self.field_names)
+
+    # Instance Methods
+    def copy(self) -> "VersionRegistryEntry":
+        """Creates a copy of the entry with copies of its lists and exact index.
+
+        Returns:
+            The copy of the entry.
+        """
+        return type(self)(self.version_type, self.versions.copy(), self.sort_keys.copy(), self.exact.copy())
@@ -0,0 +1,426 @@
+"""test_benchmarks.py
+Benchmarks of the hot paths of class versioning, these only run when pytest is given the --benchmark option.
+"""
+# Package Header #
+from src.classversioning.header import *
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+import bisect
+import json
+import os
+import pathlib
+import random
+import statistics
+import struct
+import subprocess
+import sys
+import textwrap
+import timeit
+
+# Third-Party Packages #
+import pytest
+
+# Local Packages #
+from classversioning import *
+from .test_classversioning import ClassTest
+
+
+# Definitions #
+# Functions #
+@pytest.fixture
+def tmp_dir(tmpdir):
+    """A pytest fixture that turn the tmpdir into a Path object."""
+    return pathlib.Path(tmpdir)
+
+
+def time_call(func, *args, runs=100, repeat=5):
+    """Gets the best average time of calling a function over several repeats."""
+    return min(timeit.repeat(lambda: func(*args), number=runs, repeat=repeat)) / runs
+
+
+@pytest.fixture(scope="module")
+def scaling_heads():
+    """A pytest fixture that creates a version head with a registered version class for each scaling size."""
+    heads = {}
+    for size in TestScalingBenchmarks.sizes:
+        class Head(VersionedClass):
+            _registry = VersionRegistry()
+            _VERSION_TYPE = VersionType(name=f"Scaling{size}", class_=TriNumberVersion)
+
+            @classmethod
+            def get_version_from_object(cls, obj):
+                return obj
+
+        classes = [
+            type(f"Scaling{size}_{i}", (Head,), {"VERSION": version})
+            for i, version in enumerate(TestScalingBenchmarks.create_versions(size))
+        ]
+        heads[size] = (Head, classes)
+    return heads
+
+
+# Classes #
+@pytest.mark.benchmark
+class TestDetectorBenchmarks(ClassTest):
+    """Compares compiled version detectors against hand-written ones."""
+    class_ = VersionDetectorSpec
+    timeit_runs = 1000
+
+    header = b"MAGC" + struct.pack("<3H", 1, 2, 3) + b" version=1.2.3 " + bytes(4096)
+
+    @staticmethod
+    def hand_struct(path):
+        with open(path, "rb") as file:
+            header = file.read(10)
+        if header[:4] != b"MAGC":
+            raise ValueError("Bad magic.")
+        return struct.unpack("<3H", header[4:10])
+
+    @staticmethod
+    def hand_pattern(path):
+        with open(path, "rb") as file:
+            header = file.read(64).decode("ascii", "ignore")
+        _, _, rest = header.partition("version=")
+        return tuple(int(number) for number in rest.split()[0].split("."))
+
+    @pytest.mark.parametrize("spec,hand_written", [
+        ({"magic": b"MAGC", "format_": "<3H", "offset": 4}, "hand_struct"),
+        ({"pattern": rb"version=(\d+)\.(\d+)\.(\d+)", "window": 64}, "hand_pattern"),
+    ])
+    def test_compiled_against_hand_written(self, tmp_dir, spec, hand_written):
+        path = tmp_dir.joinpath("header.bin")
+        path.write_bytes(self.header)
+        detector = self.class_(**spec).compile()
+        hand_written = getattr(self, hand_written)
+        assert detector(path) == hand_written(path) == (1, 2, 3)
+
+        compiled_time = time_call(detector, path, runs=self.timeit_runs)
+        hand_time = time_call(hand_written, path, runs=self.timeit_runs)
+        print(f"\ncompiled: {compiled_time * 1e6:.2f} us, hand-written: {hand_time * 1e6:.2f} us")
+        assert compiled_time <= hand_time * self.speed_tolerance / 100
+
+
+@pytest.mark.benchmark
+class TestComparisonBenchmarks(ClassTest):
+    """Compares sorting and bisecting versioned classes with and without their precomputed comparison keys."""
+    class_ = VersionedMeta
+    timeit_runs = 5
+    size = 5000
+
+    @classmethod
+    def create_classes(cls, name, keyed=True):
+        class Head(VersionedClass):
+            _registry = VersionRegistry()
+            _VERSION_TYPE = VersionType(name=name, class_=TriNumberVersion)
+
+        classes = []
+        for i in range(cls.size):
+            namespace = {"VERSION": (i // 1000, (i // 10) % 100, i % 10), "_registration": False}
+            class_ = type(f"{name}_{i}", (Head,), namespace)
+            if not keyed:
+                class_._VERSION_KEY = None
+            classes.append(class_)
+        return classes
+
+    def test_sort_and_bisect(self):
+        keyed = self.create_classes("Keyed")
+        unkeyed = self.create_classes("Unkeyed", keyed=False)
+        order = list(range(self.size))
+        random.Random(0).shuffle(order)
+        shuffled_keyed = [keyed[i] for i in order]
+        shuffled_unkeyed = [unkeyed[i] for i in order]
+        assert sorted(shuffled_keyed) == keyed
+        assert sorted(shuffled_unkeyed) == unkeyed
+
+        keyed_sort = time_call(sorted, shuffled_keyed, runs=self.timeit_runs)
+        unkeyed_sort = time_call(sorted, shuffled_unkeyed, runs=self.timeit_runs)
+
+        def bisect_all(classes):
+            for probe in classes[::50]:
+                bisect.bisect(classes, probe)
+
+        keyed_bisect = time_call(bisect_all, keyed, runs=self.timeit_runs)
+        unkeyed_bisect = time_call(bisect_all, unkeyed, runs=self.timeit_runs)
+        print(
+            f"\nsort: keyed {keyed_sort * 1e3:.2f} ms, fallback {unkeyed_sort * 1e3:.2f} ms"
+            f"\nbisect: keyed {keyed_bisect * 1e3:.2f} ms, fallback {unkeyed_bisect * 1e3:.2f} ms"
+        )
+        assert keyed_sort < unkeyed_sort
+        assert keyed_bisect < unkeyed_bisect
+
+
+@pytest.mark.benchmark
+class TestStartupBenchmarks(ClassTest):
+    """Compares starting a process by importing every version against loading an exported registry index."""
+    class_ = VersionRegistry
+    size = 300
+    runs = 9
+
+    script = textwrap.dedent("""
+        import sys
+        import time
+        start = time.perf_counter()
+        from classversioning import VersionedClass
+        if sys.argv[1] == "index":
+            VersionedClass._registry.load_index(sys.argv[2])
+            import startup_head
+        else:
+            import startup_all
+            import startup_head
+        obj = startup_head.StartupHead((1, 2, 0))
+        elapsed = time.perf_counter() - start
+        imported = sum(name.startswith("startup_versions.") for name in sys.modules)
+        print(type(obj).__name__, imported, elapsed)
+    """)
+
+    def write_package(self, directory):
+        directory.joinpath("startup_head.py").write_text(textwrap.dedent("""
+            from classversioning import VersionedClass, VersionType, TriNumberVersion
+
+
+            class StartupHead(VersionedClass):
+                _VERSION_TYPE = VersionType(name="Startup", class_=TriNumberVersion)
+
+                @classmethod
+                def get_version_from_object(cls, obj):
+                    return obj
+        """))
+        package = directory.joinpath("startup_versions")
+        package.mkdir()
+        package.joinpath("__init__.py").write_text("")
+        for i in range(self.size):
+            package.joinpath(f"v_{i}.py").write_text(textwrap.dedent(f"""
+                from startup_head import StartupHead
+
+
+                class Version_{i}(StartupHead):
+                    VERSION = ({i // 100}, {i % 100}, 0)
+
+                    def describe(self):
+                        return "version {i}"
+            """))
+        imports = "".join(f"import startup_versions.v_{i}\n" for i in range(self.size))
+        directory.joinpath("startup_all.py").write_text(imports)
+
+    @staticmethod
+    def run_python(directory, code, *args):
+        python_path = f"{directory}{os.pathsep}{pathlib.Path(__file__).parents[1] / 'src'}"
+        return subprocess.run(
+            [sys.executable, "-c", code, *args],
+            capture_output=True,
+            check=True,
+            cwd=directory,
+            env={**os.environ, "PYTHONPATH": python_path},
+            text=True,
+        )
+
+    def run(self, directory, *args):
+        result = self.run_python(directory, self.script, *args)
+        name, imported, elapsed = result.stdout.split()
+        return name, int(imported), float(elapsed)
+
+    def test_warm_start(self, tmp_dir):
+        self.write_package(tmp_dir)
+        index_path = tmp_dir.joinpath("index.json")
+        export = "import startup_all, startup_head, sys; startup_head.StartupHead._registry.export_index(sys.argv[1])"
+        self.run_python(tmp_dir, export, str(index_path))
+
+        # The first runs warm the file system cache, then the runs alternate so a slow moment affects both evenly.
+        self.run(tmp_dir, "import")
+        self.run(tmp_dir, "index", str(index_path))
+        import_runs = []
+        index_runs = []
+        for _ in range(self.runs):
+            import_runs.append(self.run(tmp_dir, "import"))
+            index_runs.append(self.run(tmp_dir, "index", str(index_path)))
+        assert {run[:2] for run in import_runs} == {("Version_102", self.size)}
+        assert {run[:2] for run in index_runs} == {("Version_102", 1)}
+
+        import_time = statistics.median(run[2] for run in import_runs)
+        index_time = statistics.median(run[2] for run in index_runs)
+        print(f"\nimport all: {import_time * 1e3:.1f} ms, load index: {index_time * 1e3:.1f} ms")
+        assert index_time < import_time
+
+
+@pytest.mark.benchmark
+class TestBulkRegistrationBenchmarks(ClassTest):
+    """Compares adding generated versions one at a time against adding them in bulk."""
+    class_ = VersionRegistry
+    size = 50000
+
+    def test_add_items(self):
+        versions = TestScalingBenchmarks.create_versions(self.size)
+        random.Random(0).shuffle(versions)
+        version_type = VersionType(name="Bulk", class_=TriNumberVersion)
+
+        def add_each():
+            registry = VersionRegistry()
+            for version in versions:
+                registry.add_item(version, version_type)
+            return registry
+
+        def add_bulk():
+            registry = VersionRegistry()
+            registry.add_items(versions, version_type)
+            return registry
+
+        assert add_each()["Bulk"]["keys"] == add_bulk()["Bulk"]["keys"]
+        each_time = time_call(add_each, runs=1, repeat=3)
+        bulk_time = time_call(add_bulk, runs=1, repeat=3)
+        print(f"\nadd_item: {each_time * 1e3:.1f} ms, add_items: {bulk_time * 1e3:.1f} ms")
+        assert bulk_time < each_time
+
+    def test_bulk_load_classes(self):
+        def create(bulk):
+            class Head(VersionedClass):
+                _registry = VersionRegistry()
+                _VERSION_TYPE = VersionType(name="BulkClasses", class_=TriNumberVersion)
+
+            versions = TestScalingBenchmarks.create_versions(self.size)
+            random.Random(0).shuffle(versions)
+            if bulk:
+                with Head._registry.bulk_load():
+                    classes = [type(f"Bulk_{i}", (Head,), {"VERSION": v}) for i, v in enumerate(versions)]
+            else:
+                classes = [type(f"Bulk_{i}", (Head,), {"VERSION": v}) for i, v in enumerate(versions)]
+            return Head, classes
+
+        each_time = time_call(create, False, runs=1, repeat=3)
+        bulk_time = time_call(create, True, runs=1, repeat=3)
+        print(f"\nclasses one at a time: {each_time * 1e3:.1f} ms, in a bulk load: {bulk_time * 1e3:.1f} ms")
+        assert bulk_time < each_time
+
+
+@pytest.mark.benchmark
+class TestBulkResolutionBenchmarks(ClassTest):
+    """Compares resolving the versions of many records one at a time against resolving them with one search."""
+    class_ = VersionRegistry
+    size = 10000
+    rows = 200000
+
+    def test_get_versions(self):
+        np = pytest.importorskip("numpy")
+        versions = TestScalingBenchmarks.create_versions(self.size)
+        registry = TestScalingBenchmarks.create_registry(versions)
+        generator = random.Random(0)
+        rows = [str(generator.choice(versions)) for _ in range(self.rows)]
+        array = np.array(rows)
+
+        def get_each():
+            return [registry.get_version("Scaling", row) for row in rows]
+
+        assert registry.get_versions("Scaling", array).tolist() == get_each()
+        each_time = time_call(get_each, runs=1, repeat=3)
+        bulk_time = time_call(registry.get_versions, "Scaling", array, runs=1, repeat=3)
+        print(f"\nget_version: {each_time * 1e3:.1f} ms, get_versions: {bulk_time * 1e3:.1f} ms")
+        assert bulk_time * 2 < each_time
+
+
+@pytest.mark.benchmark
+class TestScalingBenchmarks(ClassTest):
+    """Measures how the registry, comparison, and dispatch hot paths scale with the number of versions.
+
+    The time per operation at each size is divided by the time at the smallest size and the resulting ratios are
+    compared against the stored baseline, which keeps them independent of the speed of the machine. The baseline is
+    rewritten by running the benchmarks with the --benchmark-save-baseline option.
+    """
+    class_ = VersionRegistry
+    timeit_runs = 10
+    speed_tolerance = 300  # A ratio compounds the noise of two timings.
+    sizes = (10, 100, 1000, 10000, 100000)
+    probes = 1000
+    baseline_path = pathlib.Path(__file__).parent.joinpath("benchmark_baseline.json")
+
+    @staticmethod
+    def create_versions(size):
+        return [TriNumberVersion(i // 10000 + 1, (i // 100) % 100, i % 100) for i in range(size)]
+
+    @classmethod
+    def create_probes(cls, versions):
+        generator = random.Random(0)
+        return [generator.choice(versions) for _ in range(cls.probes)]
+
+    @classmethod
+    def create_registry(cls, versions):
+        registry = VersionRegistry(dispatch_cache_size=0)
+        version_type = VersionType(name="Scaling", class_=TriNumberVersion)
+        for version in versions:
+            registry.add_item(version, version_type)
+        return registry
+
+    def check_scaling(self, request, operation, measure):
+        measure(self.sizes[0])  # Warms up the caches and the interpreter before timing.
+        times = {size: measure(size) for size in self.sizes}
+        ratios = {str(size): times[size] / times[self.sizes[0]] for size in self.sizes}
+        print(f"\n{operation}: " + ", ".join(f"{size}: {times[size] * 1e6:.3f} us" for size in self.sizes))
+
+        baseline = json.loads(self.baseline_path.read_text()) if self.baseline_path.exists() else {}
+        if request.config.getoption("--benchmark-save-baseline"):
+            baseline[operation] = ratios
+            self.baseline_path.write_text(json.dumps(baseline, indent=4, sort_keys=True) + "\n")
+        elif operation not in baseline:
+            pytest.skip(f"there is no baseline for {operation}, run with --benchmark-save-baseline to create one")
+        else:
+            # Ratios below one are noise at the small sizes, so they are not allowed to tighten the limits.
+            limits = {size: max(r, 1.0) * self.speed_tolerance / 100 for size, r in baseline[operation].items()}
+            regressions = {size: ratio for size, ratio in ratios.items() if ratio > limits.get(size, float("inf"))}
+            assert not regressions, f"{operation} scaled past its baseline at {regressions}, limits {limits}"
+
+    @pytest.mark.parametrize("exact", [True, False], ids=["exact", "nearest"])
+    def test_get_version(self, request, exact):
+        def measure(size):
+            versions = self.create_versions(size)
+            registry = self.create_registry(versions)
+            probes = self.create_probes(versions if exact else [TriNumberVersion(*v.tuple()[:2], 99) for v in versions])
+
+            def lookup():
+                for probe in probes:
+                    registry.get_version("Scaling", probe, exact=exact)
+
+            return time_call(lookup, runs=self.timeit_runs) / self.probes
+
+        self.check_scaling(request, f"get_version_{'exact' if exact else 'nearest'}", measure)
+
+    def test_add_item(self, request):
+        def measure(size):
+            versions = self.create_versions(size)
+            random.Random(0).shuffle(versions)
+            runs = max(1, self.sizes[-1] // (size * 10))
+            return time_call(self.create_registry, versions, runs=runs, repeat=3) / size
+
+        self.check_scaling(request, "add_item", measure)
+
+    def test_comparisons(self, request, scaling_heads):
+        def measure(size):
+            classes = scaling_heads[size][1]
+            probes = self.create_probes(classes)
+
+            def search():
+                for probe in probes:
+                    bisect.bisect(classes, probe)
+
+            return time_call(search, runs=self.timeit_runs) / self.probes
+
+        self.check_scaling(request, "comparisons", measure)
+
+    def test_dispatch(self, request, scaling_heads):
+        def measure(size):
+            head, classes = scaling_heads[size]
+            probes = self.create_probes([class_.VERSION for class_ in classes])
+            assert all(type(head(probe)).VERSION == probe for probe in probes)
+
+            def dispatch():
+                for probe in probes:
+                    head(probe)
+
+            return time_call(dispatch, runs=self.timeit_runs) / self.probes
+
+        self.check_scaling(request, "dispatch", measure)
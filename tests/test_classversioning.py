@@ -15,13 +15,24 @@ __email__ = __email__
 
 # Imports #
 # Standard Libraries #
+import asyncio
+import bisect
+import gc
+import multiprocessing
 import pathlib
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+import struct
+import sys
+import threading
+import tracemalloc
 
 # Third-Party Packages #
 import pytest
 
 # Local Packages #
 from classversioning import *
+from classversioning.packedkeys import get_key_columns, get_key_matrix, pack_ranked_keys
 
 
 # Definitions #
@@ -32,6 +43,21 @@ def tmp_dir(tmpdir):
     return pathlib.Path(tmpdir)
 
 
+def describe_versioned(obj):
+    """Gets the class name and value of a versioned object, used to check objects sent to worker processes."""
+    return type(obj).__name__, obj.value
+
+
+def read_shared_registry(registry, connection):
+    """Sends the closest version to 1.9.0 in a forked registry before and after the parent process publishes 1.8.0."""
+    version = registry.get_version_cached("Shared", "1.9.0")
+    connection.send((type(registry.data["Shared"]).__name__, str(version)))
+    registry.add_item(TriNumberVersion(1, 8, 0), "Shared")
+    connection.send(str(registry.get_version_cached("Shared", "1.9.0")))
+    connection.recv()
+    connection.send(str(registry.get_version_cached("Shared", "1.9.0")))
+
+
 # Classes #
 class ClassTest:
     """Default class tests that all classes should pass."""
@@ -125,6 +151,37 @@ class TestVersionedClass(ClassTest):
     def test_auto_version(self, arg, expected):
         assert self.ExampleVersioning(arg).__class__ is expected
 
+    def test_dispatch_many(self):
+        args = [arg for arg, _ in self.version_selection] * 2
+        expected = [class_ for _, class_ in self.version_selection] * 2
+        assert [type(obj) for obj in self.ExampleVersioning.dispatch_many(args)] == expected
+        assert self.ExampleVersioning.dispatch_many(args, construct=False) == expected
+
+    def test_iter_dispatch_resolves_once(self):
+        registry = self.ExampleVersioning._registry
+        registry.dispatch_cache.clear()
+        objs = self.ExampleVersioning.iter_dispatch(iter([1, 2, 3, "a", "b"]), construct=False)
+        assert list(objs) == [self.Example_1_0_0] * 3 + [self.Example_1_1_0] * 2
+        assert sum(registry.dispatch_cache.info()[:2]) == 2
+
+    @pytest.mark.parametrize("executor", ["thread", "process"])
+    def test_dispatch_parallel(self, executor):
+        args = [arg for arg, _ in self.version_selection] * 4
+        expected = [class_ for _, class_ in self.version_selection] * 4
+        objs = self.ExampleVersioning.dispatch_parallel(args, executor=executor, max_workers=2, chunksize=3)
+        assert [type(obj) for obj in objs] == expected
+
+    @pytest.mark.parametrize("arg,expected", version_selection)
+    def test_new_async(self, arg, expected):
+        assert type(asyncio.run(self.ExampleVersioning.new_async(arg))) is expected
+
+    @pytest.mark.parametrize("max_concurrency", [None, 2])
+    def test_dispatch_async(self, max_concurrency):
+        args = [arg for arg, _ in self.version_selection] * 4
+        expected = [class_ for _, class_ in self.version_selection] * 4
+        objs = asyncio.run(self.ExampleVersioning.dispatch_async(args, max_concurrency=max_concurrency))
+        assert [type(obj) for obj in objs] == expected
+
     def test_auto_version_error(self):
         try:
             self.BadExample("random")
@@ -143,6 +200,11 @@ class TestVersionedClass(ClassTest):
     versions_le = ["1.2.0", (4, 0, 0), TriNumberVersion(1, 9, 0, ver_name="Example"), Example_1_1_0]
     versions_ge = ["1.2.0", (0, 1, 0), TriNumberVersion(1, 3, 0, ver_name="Example"), Example_2_0_0]
 
+    def test_version_key(self):
+        assert self.Example_1_1_0._VERSION_KEY == (1, 1, 0)
+        classes = [self.Example_2_0_0, self.Example_1_1_0, self.Example_2_x_0, self.Example_1_0_0]
+        assert sorted(classes) == [self.Example_1_0_0, self.Example_1_1_0, self.Example_2_0_0, self.Example_2_x_0]
+
     @pytest.mark.parametrize("version_", versions_e)
     def test_version_comparison_equals(self, version_):
         assert self.Example_1_0_0 == version_
@@ -168,6 +230,982 @@ class TestVersionedClass(ClassTest):
         assert self.Example_2_0_0 >= version_
 
 
+class TestSingleConstruction(ClassTest):
+    class_ = VersionedClass
+
+    @staticmethod
+    def create_versions(name, metaclass, single_construction=True):
+        class CountingVersioning(VersionedClass, metaclass=metaclass):
+            _registry = VersionRegistry()
+            _VERSION_TYPE = VersionType(name=name, class_=TriNumberVersion)
+            _single_construction = single_construction
+
+            @classmethod
+            def get_version_from_object(cls, obj):
+                return obj
+
+        class Counting_1_0_0(CountingVersioning):
+            VERSION = "1.0.0"
+            init_calls = 0
+
+            def __init__(self, obj):
+                type(self).init_calls += 1
+                self.obj = obj
+
+        return CountingVersioning, Counting_1_0_0
+
+    @pytest.mark.parametrize("metaclass", [VersionedMeta, VersionedInitMeta, CachingVersionedInitMeta])
+    def test_init_called_once(self, metaclass):
+        head, version = self.create_versions(f"Counting{metaclass.__name__}", metaclass)
+        obj = head("1.2.0")
+        assert type(obj) is version
+        assert obj.obj == "1.2.0"
+        assert version.init_calls == 1
+
+    def test_legacy_construction(self):
+        head, version = self.create_versions("CountingLegacy", VersionedMeta, single_construction=False)
+        assert type(head("1.2.0")) is version
+        assert version.init_calls == 2
+
+
+class TestFileVersionCache(ClassTest):
+    class_ = FileVersionCache
+
+    class FileVersioning(VersionedClass):
+        _registry = VersionRegistry()
+        _VERSION_TYPE = VersionType(name="File", class_=TriNumberVersion)
+        _version_cache = FileVersionCache(maxsize=4)
+        reads = 0
+
+        def __init__(self, path):
+            self.path = path
+
+        @classmethod
+        def get_version_from_object(cls, obj):
+            cls.reads += 1
+            return pathlib.Path(obj).read_text()
+
+    class File_1_0_0(FileVersioning):
+        VERSION = "1.0.0"
+
+    class File_2_0_0(FileVersioning):
+        VERSION = "2.0.0"
+
+    def test_cached_detection(self, tmp_dir):
+        head = self.FileVersioning
+        path = tmp_dir.joinpath("file.txt")
+        path.write_text("1.0.0")
+        assert type(head(path)) is self.File_1_0_0
+        assert type(head(str(path))) is self.File_1_0_0
+        assert head.reads == 1
+
+        path.write_text("2.0.0\n")
+        assert type(head(path)) is self.File_2_0_0
+        assert head.reads == 2
+
+        head.invalidate_version_cache(path)
+        assert type(head(path)) is self.File_2_0_0
+        assert head.reads == 3
+        assert head._version_cache.info().hits == 1
+
+
+class TestStructVersionDetector(ClassTest):
+    class_ = StructVersionDetector
+
+    class HeaderVersioning(VersionedClass):
+        _registry = VersionRegistry()
+        _VERSION_TYPE = VersionType(name="Header", class_=TriNumberVersion)
+        _version_detector = StructVersionDetector("<3H", offset=4)
+
+        def __init__(self, path):
+            self.path = path
+
+    class Header_1_0_0(HeaderVersioning):
+        VERSION = "1.0.0"
+
+    class Header_1_2_0(HeaderVersioning):
+        VERSION = "1.2.0"
+
+    @pytest.mark.parametrize("version_,expected", [((1, 0, 5), Header_1_0_0), ((1, 3, 0), Header_1_2_0)])
+    def test_dispatch(self, tmp_dir, version_, expected):
+        path = tmp_dir.joinpath("header.bin")
+        path.write_bytes(b"HEAD" + struct.pack("<3H", *version_) + b"data")
+        assert type(self.HeaderVersioning(path)) is expected
+        with path.open("rb") as file:
+            assert self.HeaderVersioning._version_detector(file) == version_
+
+    def test_buffer(self):
+        assert self.class_("<3H", offset=4)(b"HEAD" + struct.pack("<3H", 1, 2, 3)) == (1, 2, 3)
+
+    def test_short_file(self, tmp_dir):
+        path = tmp_dir.joinpath("empty.bin")
+        path.write_bytes(b"")
+        with pytest.raises(ValueError):
+            self.HeaderVersioning._version_detector(path)
+
+
+class TestVersionDetectorSpec(ClassTest):
+    class_ = VersionDetectorSpec
+
+    header = b"MAGC" + struct.pack("<3H", 1, 2, 3) + b" version=4.5.6 "
+
+    detections = [
+        ({"magic": b"MAGC", "format_": "<3H", "offset": 4}, (1, 2, 3)),
+        ({"format_": "<H", "offset": 6, "transform": lambda values: (1, values[0], 0)}, (1, 2, 0)),
+        ({"pattern": rb"version=(\d+)\.(\d+)\.(\d+)"}, (4, 5, 6)),
+        ({"pattern": r"version=([\d.]+)", "window": 32}, "4.5.6"),
+        ({"pattern": rb"version=(\d+)\.(\d+)\.(\d+)(?:-(\w+))?"}, (4, 5, 6)),
+    ]
+
+    @pytest.mark.parametrize("spec,expected", detections)
+    def test_compiled_detection(self, tmp_dir, spec, expected):
+        detector = self.class_(**spec).compile()
+        path = tmp_dir.joinpath("header.bin")
+        path.write_bytes(self.header)
+        assert detector(self.header) == expected
+        assert detector(path) == expected
+
+    def test_open_file_position(self, tmp_dir):
+        detector = self.class_(magic=b"MAGC", format_="<3H", offset=4).compile()
+        path = tmp_dir.joinpath("header.bin")
+        path.write_bytes(self.header)
+        with path.open("rb") as file:
+            file.seek(2)
+            assert detector(file) == (1, 2, 3)
+            assert detector(file) == (1, 2, 3)
+            assert file.tell() == 2
+
+    @pytest.mark.parametrize(
+        "spec",
+        [{"magic": b"NOPE", "format_": "<3H"}, {"pattern": b"version=", "window": 8}, {"pattern": rb"version=(x)?"}],
+    )
+    def test_compiled_mismatch(self, spec):
+        with pytest.raises(ValueError):
+            self.class_(**spec).compile()(self.header)
+
+    def test_invalid_spec(self):
+        with pytest.raises(ValueError):
+            self.class_(magic=b"MAGC")
+
+
+class TestLazyRegistration(ClassTest):
+    class_ = LazyVersionedItem
+
+    class LazyVersioning(VersionedClass):
+        _registry = VersionRegistry()
+        _VERSION_TYPE = VersionType(name="Lazy", class_=TriNumberVersion)
+
+        @classmethod
+        def get_version_from_object(cls, obj):
+            return obj
+
+    class Lazy_1_0_0(LazyVersioning):
+        VERSION = "1.0.0"
+
+    @staticmethod
+    def write_module(directory, name, version_):
+        directory.joinpath(f"{name}.py").write_text(
+            "from tests.test_classversioning import TestLazyRegistration\n\n\n"
+            f"class Version(TestLazyRegistration.LazyVersioning):\n    VERSION = '{version_}'\n"
+        )
+
+    def test_lazy_version(self, tmp_dir, monkeypatch):
+        monkeypatch.syspath_prepend(str(tmp_dir))
+        self.write_module(tmp_dir, "lazy_version_2", "2.0.0")
+        placeholder = self.LazyVersioning.register_lazy_version("2.0.0", "lazy_version_2:Version")
+        assert isinstance(placeholder, LazyVersionedItem)
+        assert self.LazyVersioning.get_version_class("1.5.0") is self.Lazy_1_0_0
+        assert "lazy_version_2" not in sys.modules
+
+        class_ = self.LazyVersioning.get_version_class("2.1.0")
+        assert class_ is sys.modules["lazy_version_2"].Version
+        assert type(self.LazyVersioning("2.0.0")) is class_
+        assert placeholder not in self.LazyVersioning._registry["Lazy"]["list"]
+        assert self.LazyVersioning.register_lazy_version("2.0.0", "lazy_version_2:Version") is class_
+
+    def test_entry_points(self, tmp_dir, monkeypatch):
+        monkeypatch.syspath_prepend(str(tmp_dir))
+        self.write_module(tmp_dir, "lazy_version_3", "3.0.0")
+        dist_info = tmp_dir.joinpath("lazy_versions-1.0.dist-info")
+        dist_info.mkdir()
+        dist_info.joinpath("METADATA").write_text("Metadata-Version: 2.1\nName: lazy-versions\nVersion: 1.0\n")
+        dist_info.joinpath("entry_points.txt").write_text("[classversioning.Lazy]\n3.0.0 = lazy_version_3:Version\n")
+
+        assert len(self.LazyVersioning.register_entry_points()) == 1
+        assert "lazy_version_3" not in sys.modules
+        assert self.LazyVersioning.get_latest_version_class() is sys.modules["lazy_version_3"].Version
+
+
+class TestThreadSafeRegistry(ClassTest):
+    class_ = VersionRegistry
+    readers = 8
+    writes = 300
+
+    class ConcurrentVersioning(VersionedClass):
+        _registry = VersionRegistry(thread_safe=True)
+        _VERSION_TYPE = VersionType(name="Concurrent", class_=TriNumberVersion)
+
+    class Concurrent_1_0_0(ConcurrentVersioning):
+        VERSION = "1.0.0"
+
+    def read(self, done, errors):
+        head = self.ConcurrentVersioning
+        registry = head._registry
+        try:
+            while not done.is_set():
+                entry = registry["Concurrent"]
+                assert len(entry["list"]) == len(entry["keys"])
+                assert entry["keys"] == sorted(entry["keys"])
+                assert registry.get_version("Concurrent", "1.0.0", exact=True) is self.Concurrent_1_0_0
+                class_ = head.get_version_class("1.500.0")
+                assert class_.VERSION.tuple() <= (1, 500, 0)
+                assert registry.get_version("Concurrent", class_.VERSION, exact=True) is class_
+        except Exception as e:
+            errors.append(e)
+
+    def write(self, done, errors):
+        head = self.ConcurrentVersioning
+        try:
+            for i in range(self.writes):
+                type(f"Concurrent_1_{i}_1", (head,), {"VERSION": (1, self.writes - i, 1)})
+                if i % 50 == 0:
+                    head._registry.sort("Concurrent")
+        except Exception as e:
+            errors.append(e)
+        finally:
+            done.set()
+
+    def test_readers_with_concurrent_writer(self):
+        head = self.ConcurrentVersioning
+        registry = head._registry
+        done = threading.Event()
+        errors = []
+
+        threads = [threading.Thread(target=self.read, args=(done, errors)) for _ in range(self.readers)]
+        threads.append(threading.Thread(target=self.write, args=(done, errors)))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert not errors
+        assert len(registry["Concurrent"]["list"]) == self.writes + 2
+        assert head.get_version_class("1.500.0").VERSION.tuple() == (1, self.writes, 1)
+
+
+class TestWeakRegistry(ClassTest):
+    class_ = VersionRegistry
+    size = 20
+    rounds = 20
+
+    class WeakVersioning(VersionedClass):
+        _registry = VersionRegistry(weak=True)
+        _VERSION_TYPE = VersionType(name="Weak", class_=TriNumberVersion)
+
+    def create_versions(self):
+        return [
+            type(f"Weak_1_{i}_0", (self.WeakVersioning,), {"VERSION": (1, i, 0), "payload": bytearray(4096)})
+            for i in range(self.size)
+        ]
+
+    def test_collected_versions_are_purged(self):
+        head = self.WeakVersioning
+        registry = head._registry
+        classes = self.create_versions()
+        assert head.get_version_class("1.5.3") is classes[5]
+        assert registry.get_version("Weak", "1.7.0", exact=True) is classes[7]
+        assert registry.get_latest_version("Weak") is classes[-1]
+
+        reference = registry["Weak"]["list"][1]
+        del classes
+        gc.collect()
+        assert reference() is None
+        assert registry["Weak"]["keys"] == [(0, 0, 0)]
+        assert registry["Weak"]["exact"] == {(0, 0, 0): registry["Weak"]["list"][0]}
+        assert head.get_version_class("1.5.3") is head
+        assert registry.get_latest_version("Weak") is head
+
+    def test_dynamic_versions_do_not_leak(self):
+        def churn():
+            classes = self.create_versions()
+            assert self.WeakVersioning.get_version_class("1.3.0") is classes[3]
+            del classes
+            gc.collect()
+
+        churn()
+        tracemalloc.start()
+        try:
+            churn()
+            baseline = tracemalloc.get_traced_memory()[0]
+            for _ in range(self.rounds):
+                churn()
+            grown = tracemalloc.get_traced_memory()[0] - baseline
+        finally:
+            tracemalloc.stop()
+
+        assert len(self.WeakVersioning._registry["Weak"]["list"]) == 1
+        assert grown < self.size * 4096
+
+
+class TestScopedRegistries(ClassTest):
+    class_ = OverlayVersionRegistry
+
+    class IsolatedVersioning(VersionedClass):
+        _VERSION_TYPE = VersionType(name="Isolated", class_=TriNumberVersion)
+        _isolate_registry = True
+
+        @classmethod
+        def get_version_from_object(cls, obj):
+            return obj
+
+    class Isolated_1_0_0(IsolatedVersioning):
+        VERSION = "1.0.0"
+
+    class Isolated_2_0_0(IsolatedVersioning):
+        VERSION = "2.0.0"
+
+    def test_isolated_registry(self):
+        registry = self.IsolatedVersioning._registry
+        assert registry is not VersionedClass._registry
+        assert "Isolated" in registry
+        assert "Isolated" not in VersionedClass._registry
+        assert self.Isolated_1_0_0._registry is registry
+        assert type(self.IsolatedVersioning("1.5.0")) is self.Isolated_1_0_0
+
+    def test_overlay_registry(self):
+        head = self.IsolatedVersioning
+        with head.overlay_registry() as overlay:
+            assert head.get_registry() is overlay
+            assert head.get_version_class("1.5.0") is self.Isolated_1_0_0
+
+            class Isolated_1_5_0(head):
+                VERSION = "1.5.0"
+
+            assert overlay.data["Isolated"]["list"] == [Isolated_1_5_0]
+            assert type(head("1.7.0")) is Isolated_1_5_0
+            assert head.get_version_class("2.1.0") is self.Isolated_2_0_0
+            assert head.get_version_class("1.0.0", exact=True) is self.Isolated_1_0_0
+            assert head.get_latest_version_class() is self.Isolated_2_0_0
+
+            with head.overlay_registry() as inner:
+                assert inner.base is overlay
+                assert head.get_version_class("1.7.0") is Isolated_1_5_0
+
+        assert head.get_registry() is head._registry
+        assert head.get_version_class("1.7.0") is self.Isolated_1_0_0
+        assert Isolated_1_5_0 not in head._registry["Isolated"]["list"]
+
+    def test_overlay_context_scope(self):
+        head = self.IsolatedVersioning
+        seen = []
+        with head.overlay_registry():
+            thread = threading.Thread(target=lambda: seen.append(head.get_registry()))
+            thread.start()
+            thread.join()
+        assert seen == [head._registry]
+
+
+class TestVersionRegistry(ClassTest):
+    class_ = VersionRegistry
+
+    class RegistryVersioning(VersionedClass):
+        _registry = VersionRegistry()
+        _VERSION_TYPE = VersionType(name="Registry", class_=TriNumberVersion)
+
+    class Registry_2_0_0(RegistryVersioning):
+        VERSION = "2.0.0"
+
+    class Registry_1_0_0(RegistryVersioning):
+        VERSION = "1.0.0"
+
+    class Registry_1_5_0(RegistryVersioning):
+        VERSION = "1.5.0"
+
+    closest_selection = [
+        ("1.2.0", Registry_1_0_0),
+        ((1, 5, 0), Registry_1_5_0),
+        ("9.0.0", Registry_2_0_0),
+    ]
+
+    def test_keys_parallel(self):
+        entry = self.RegistryVersioning._registry["Registry"]
+        assert entry["keys"] == [(0, 0, 0), (1, 0, 0), (1, 5, 0), (2, 0, 0)]
+        assert [class_.VERSION.tuple() for class_ in entry["list"]] == entry["keys"]
+
+    @pytest.mark.parametrize("version_,expected", closest_selection)
+    def test_get_version_closest(self, version_, expected):
+        assert self.RegistryVersioning._registry.get_version("Registry", version_) is expected
+
+    def test_get_version_exact_missing(self):
+        with pytest.raises(ValueError):
+            self.RegistryVersioning._registry.get_version("Registry", "1.2.0", exact=True)
+
+    @pytest.mark.parametrize("version_", ["1.5.0", (1, 5, 0), TriNumberVersion(1, 5, 0), Registry_1_5_0])
+    def test_get_version_exact(self, version_):
+        assert self.RegistryVersioning._registry.get_version("Registry", version_, exact=True) is self.Registry_1_5_0
+
+    def test_exact_index(self):
+        entry = self.RegistryVersioning._registry["Registry"]
+        assert entry["exact"] == dict(zip(entry["keys"], entry["list"]))
+
+    def test_export_and_load_index(self, tmp_dir):
+        path = tmp_dir.joinpath("index.json")
+        self.RegistryVersioning._registry.export_index(path)
+        registry = VersionRegistry()
+        registry.load_index(path)
+        entry = registry["Registry"]
+        assert all(isinstance(item, LazyVersionedItem) for item in entry["list"])
+        assert entry["keys"] == self.RegistryVersioning._registry["Registry"]["keys"]
+        assert registry.get_version("Registry", "1.6.0") is self.Registry_1_5_0
+        assert registry.get_version("Registry", "2.0.0", exact=True) is self.Registry_2_0_0
+        assert entry["exact"][(1, 5, 0)] is self.Registry_1_5_0
+
+    def test_sort_rebuilds_keys(self):
+        registry = self.RegistryVersioning._registry
+        entry = registry["Registry"]
+        entry["list"].reverse()
+        registry.sort("Registry")
+        assert entry["keys"] == sorted(entry["keys"])
+        assert entry["exact"][(1, 5, 0)] is self.Registry_1_5_0
+        assert registry.get_version("Registry", "1.6.0") is self.Registry_1_5_0
+
+    def test_slotted_entries(self):
+        entry = self.RegistryVersioning._registry["Registry"]
+        assert isinstance(entry, VersionRegistryEntry)
+        assert entry["list"] is entry.versions and entry["keys"] is entry.sort_keys
+        assert entry["type"] is self.RegistryVersioning._VERSION_TYPE
+        assert entry.latest is self.Registry_2_0_0
+        assert dict(entry) == {
+            "type": entry.version_type,
+            "list": entry.versions,
+            "keys": entry.sort_keys,
+            "exact": entry.exact,
+        }
+        assert not hasattr(entry, "__dict__")
+        assert sys.getsizeof(entry) < sys.getsizeof(dict(entry))
+
+    def test_dictionary_entries_are_converted(self):
+        version_type = VersionType(name="Converted", class_=TriNumberVersion)
+        versions = [TriNumberVersion(1, 0, 0), TriNumberVersion(1, 1, 0)]
+        registry = VersionRegistry({"Converted": {"type": version_type, "list": versions}})
+        assert isinstance(registry["Converted"], VersionRegistryEntry)
+        assert registry["Converted"]["keys"] == [(1, 0, 0), (1, 1, 0)]
+        assert registry.get_version("Converted", "1.0.5") is versions[0]
+
+
+class TestRangeQueries(ClassTest):
+    class_ = VersionRegistry
+
+    class RangeVersioning(VersionedClass):
+        _registry = VersionRegistry()
+        _VERSION_TYPE = VersionType(name="Range", class_=TriNumberVersion)
+
+    class Range_1_0_0(RangeVersioning):
+        VERSION = "1.0.0"
+
+    class Range_1_2_0(RangeVersioning):
+        VERSION = "1.2.0"
+
+    class Range_1_5_3(RangeVersioning):
+        VERSION = "1.5.3"
+
+    class Range_2_0_0(RangeVersioning):
+        VERSION = "2.0.0"
+
+    class Range_2_1_0(RangeVersioning):
+        VERSION = "2.1.0"
+
+    def test_ranges_and_predicates(self):
+        registry = self.RangeVersioning._registry
+        assert list(registry.iter_range("Range", "1.2.0", "2.0.0")) == [self.Range_1_2_0, self.Range_1_5_3]
+        assert list(registry.iter_range("Range", "1.2.0", "2.0.0", include_lower=False, include_upper=True)) == [
+            self.Range_1_5_3,
+            self.Range_2_0_0,
+        ]
+        assert list(registry.iter_range("Range", upper="1.0.0", reverse=True)) == [self.RangeVersioning]
+        odd = list(registry.iter_range("Range", "1.0.0", predicate=lambda class_: class_.VERSION.minor % 2))
+        assert odd == [self.Range_1_5_3, self.Range_2_1_0]
+
+    def test_next_and_latest_compatible(self):
+        registry = self.RangeVersioning._registry
+        assert registry.get_next_version("Range", "1.2.0") is self.Range_1_5_3
+        assert registry.get_next_version("Range", "1.3.0") is self.Range_1_5_3
+        assert registry.get_next_version("Range", "2.1.0", None) is None
+        with pytest.raises(ValueError):
+            registry.get_next_version("Range", "3.0.0")
+
+        assert registry.get_latest_compatible("Range", "1.0.0") is self.Range_1_5_3
+        assert registry.get_latest_compatible("Range", "1.2.9", depth=2) is self.Range_1_2_0
+        assert registry.get_latest_compatible("Range", "3.0.0", default=None) is None
+        for depth in (0, 4):
+            with pytest.raises(ValueError, match="depth"):
+                registry.get_latest_compatible("Range", "1.2.9", depth=depth)
+
+    def test_compatibility_matrix(self):
+        registry = self.RangeVersioning._registry
+        matrix = registry.get_compatibility_matrix("Range", ["1.1.0", "2.0.0"])
+        assert matrix == {
+            (1, 1, 0): [self.Range_1_2_0, self.Range_1_5_3],
+            (2, 0, 0): [self.Range_2_0_0, self.Range_2_1_0],
+        }
+        assert registry.get_compatibility_matrix("Range")[(1, 5, 3)] == [self.Range_1_5_3]
+
+    def test_overlay_ranges_merge(self):
+        with self.RangeVersioning.overlay_registry() as overlay:
+            class Range_1_3_0(self.RangeVersioning):
+                VERSION = "1.3.0"
+
+            assert list(overlay.iter_range("Range", "1.2.0", "2.0.0")) == [
+                self.Range_1_2_0,
+                Range_1_3_0,
+                self.Range_1_5_3,
+            ]
+            assert overlay.get_next_version("Range", "1.2.0") is Range_1_3_0
+        assert self.RangeVersioning._registry.get_next_version("Range", "1.2.0") is self.Range_1_5_3
+
+
+class TestBulkRegistration(ClassTest):
+    class_ = VersionRegistry
+
+    def test_add_items_sorts_once(self):
+        registry = VersionRegistry()
+        version_type = VersionType(name="Bulk", class_=TriNumberVersion)
+        versions = [TriNumberVersion(1, i % 7, i) for i in range(50)]
+        registry.add_items(reversed(versions), version_type)
+        registry.add_items([TriNumberVersion(0, 1, 0)], "Bulk")
+        entry = registry["Bulk"]
+        assert entry["keys"] == sorted(entry["keys"])
+        assert entry["list"][0] == TriNumberVersion(0, 1, 0)
+        assert registry.get_version("Bulk", (1, 3, 10), exact=True) == TriNumberVersion(1, 3, 10)
+
+    def test_bulk_load_defers_registration(self):
+        class BulkVersioning(VersionedClass):
+            _registry = VersionRegistry()
+            _VERSION_TYPE = VersionType(name="BulkLoad", class_=TriNumberVersion)
+
+        registry = BulkVersioning._registry
+        lazy_item = registry.add_lazy_item("BulkLoad", "1.1.0", "missing.module:Version")
+        with registry.bulk_load():
+            with registry.bulk_load():
+                classes = [type(f"Bulk_1_{i}_0", (BulkVersioning,), {"VERSION": (1, i, 0)}) for i in (3, 1, 2)]
+            assert len(registry["BulkLoad"]["list"]) == 2
+
+        assert registry["BulkLoad"]["list"] == [BulkVersioning, classes[1], classes[2], classes[0]]
+        assert lazy_item not in registry["BulkLoad"]["exact"].values()
+        assert BulkVersioning.get_version_class("1.2.5") is classes[2]
+
+    def test_bulk_load_only_defers_its_thread(self):
+        registry = self.class_(thread_safe=True)
+        version_type = VersionType("BulkThread", TriNumberVersion)
+        registry.add_item(TriNumberVersion(1, 0, 0), version_type)
+        with registry.bulk_load():
+            registry.add_item(TriNumberVersion(1, 1, 0), version_type)
+            thread = threading.Thread(target=registry.add_item, args=(TriNumberVersion(1, 2, 0), version_type))
+            thread.start()
+            thread.join()
+            assert registry["BulkThread"]["keys"] == [(1, 0, 0), (1, 2, 0)]
+        assert registry["BulkThread"]["keys"] == [(1, 0, 0), (1, 1, 0), (1, 2, 0)]
+
+
+class TestBulkResolution(ClassTest):
+    class_ = VersionRegistry
+
+    class BulkResolveVersioning(VersionedClass):
+        _registry = VersionRegistry()
+        _VERSION_TYPE = VersionType(name="BulkResolve", class_=TriNumberVersion)
+
+    class BulkResolve_1_0_0(BulkResolveVersioning):
+        VERSION = "1.0.0"
+
+    class BulkResolve_1_2_0(BulkResolveVersioning):
+        VERSION = "1.2.0"
+
+    class BulkResolve_2_0_0(BulkResolveVersioning):
+        VERSION = "2.0.0"
+
+    @pytest.mark.parametrize("exact", [False, True])
+    def test_matches_get_version(self, exact):
+        np = pytest.importorskip("numpy")
+        registry = self.BulkResolveVersioning._registry
+        keys = ["1.0.0", "1.2.0", "2.0.0", "0.0.0"] if exact else ["1.1.9", "1.2.0", "3.0.0", "0.5.0", "1.1.9"]
+        expected = [registry.get_version("BulkResolve", key, exact=exact) for key in keys]
+        assert registry.get_versions("BulkResolve", keys, exact=exact).tolist() == expected
+        assert registry.get_versions("BulkResolve", np.array(keys), exact=exact).tolist() == expected
+        rows = np.array([registry.create_key("BulkResolve", key) for key in keys])
+        assert registry.get_versions("BulkResolve", rows, exact=exact).tolist() == expected
+        indices = registry.get_versions("BulkResolve", keys, exact=exact, indices=True)
+        assert [registry["BulkResolve"]["list"][i] for i in indices] == expected
+
+    def test_version_keys(self):
+        pytest.importorskip("numpy")
+        registry = self.BulkResolveVersioning._registry
+        keys = [TriNumberVersion(1, 5, 0), "2.3.0", TriNumberVersion(1, 5, 0), [1, 2, 0]]
+        expected = [registry.get_version("BulkResolve", key) for key in keys]
+        assert registry.get_versions("BulkResolve", keys).tolist() == expected
+        assert self.BulkResolveVersioning.get_version_classes(keys[:2]).tolist() == expected[:2]
+
+    def test_errors_match_get_version(self):
+        pytest.importorskip("numpy")
+        registry = self.BulkResolveVersioning._registry
+        with pytest.raises(ValueError, match="1.1.0 is not in the registry"):
+            registry.get_versions("BulkResolve", ["1.0.0", "1.1.0"], exact=True)
+
+        class BelowVersioning(VersionedClass):
+            _registry = VersionRegistry()
+            _VERSION_TYPE = VersionType(name="Below", class_=TriNumberVersion)
+            VERSION = "1.0.0"
+
+        with pytest.raises(ValueError) as scalar_error:
+            BelowVersioning._registry.get_version("Below", "0.1.0")
+        with pytest.raises(ValueError) as bulk_error:
+            BelowVersioning._registry.get_versions("Below", ["1.0.0", "0.1.0"])
+        assert str(bulk_error.value) == str(scalar_error.value)
+
+    def test_large_numbers_match_get_version(self):
+        np = pytest.importorskip("numpy")
+        registry = self.class_()
+        version_type = VersionType("Big", TriNumberVersion)
+        registry.add_items([TriNumberVersion(v) for v in ("1.0.0", "2024.1.0", "2024.3000000.0")], version_type)
+        keys = ["2024.3000000.5", "2024.2.0", "5000000.0.0", (2 ** 70, 0, 0)]
+        expected = [registry.get_version("Big", key) for key in keys]
+        assert registry.get_versions("Big", keys).tolist() == expected
+
+        rows = np.array([[2024, 1], [2024, 3000000]])
+        sort_keys = registry["Big"]["keys"]
+        expected = [bisect.bisect(sort_keys, tuple(row)) - 1 for row in rows.tolist()]
+        assert registry.get_versions("Big", rows, indices=True).tolist() == expected
+
+    def test_shorter_keys_pack_before_longer_keys(self):
+        pytest.importorskip("numpy")
+        keys = [(0, 9, 9, 9), (1,), (1, 0), (1, 0, 0), (1, 0, 0, 5)]
+        matrix, lengths = get_key_matrix(keys, 4)
+        packed = pack_ranked_keys(matrix, lengths, get_key_columns(matrix, lengths)).tolist()
+        assert packed == sorted(packed) and len(set(packed)) == len(keys)
+
+    def test_version_classes_and_overlay(self):
+        pytest.importorskip("numpy")
+        head = self.BulkResolveVersioning
+        classes = head.get_version_classes([(1, 5, 0), "2.1.0"]).tolist()
+        assert classes == [self.BulkResolve_1_2_0, self.BulkResolve_2_0_0]
+        with head.overlay_registry() as overlay:
+            class BulkResolve_1_5_0(head):
+                VERSION = "1.5.0"
+
+            assert head.get_version_classes(["1.6.0", "1.1.0"]).tolist() == [BulkResolve_1_5_0, self.BulkResolve_1_0_0]
+            with pytest.raises(ValueError):
+                overlay.get_versions("BulkResolve", ["1.6.0"], indices=True)
+        assert head.get_version_classes(["1.6.0"]).tolist() == [self.BulkResolve_1_2_0]
+
+
+class TestVersionInternCache(ClassTest):
+    class_ = VersionInternCache
+
+    def test_interning_per_type(self):
+        cache = self.class_(maxsize=2)
+        first_type = VersionType(name="Interned", class_=TriNumberVersion)
+        second_type = VersionType(name="Interned", class_=TriNumberVersion)
+        version = cache.get_version(first_type, "1.2.3")
+        assert cache.get_version(first_type, "1.2.3") is version
+        assert cache.get_version(first_type, [1, 2, 3]) is cache.get_version(first_type, (1, 2, 3))
+        assert cache.get_version(first_type, version) is version
+        assert version.version_type is first_type
+
+        other = cache.get_version(second_type, "1.2.3")
+        assert other is not version and other.version_type is second_type
+        assert cache.get_version(first_type, "1.2.3") is not version  # Evicted by the other entries.
+        assert len(cache) == 2
+
+    def test_one_lookup_per_key(self):
+        cache = self.class_()
+        version_type = VersionType(name="Counted", class_=TriNumberVersion)
+        cache.get_version(version_type, "1.2.3")
+        cache.get_version(version_type, "1.2.3")
+        cache.get_version(version_type, [1, 2, 3])
+        cache.get_version(version_type, TriNumberVersion(1, 2, 3))
+        info = cache.info()
+        assert (info.hits, info.misses) == (1, 2)
+
+    def test_classes_and_lookups_share_versions(self):
+        class InternVersioning(VersionedClass):
+            _registry = VersionRegistry()
+            _VERSION_TYPE = VersionType(name="Intern", class_=TriNumberVersion)
+
+        class Intern_1_0_0(InternVersioning):
+            VERSION = "1.0.0"
+
+        class Intern_1_0_0_copy(InternVersioning):
+            _registration = False
+            VERSION = "1.0.0"
+
+        assert Intern_1_0_0.VERSION is Intern_1_0_0_copy.VERSION
+        assert version_intern_cache.get_version(InternVersioning._VERSION_TYPE, "1.0.0") is Intern_1_0_0.VERSION
+        assert Intern_1_0_0 == "1.0.0"
+        assert not Intern_1_0_0 != "1.0.0"
+        assert InternVersioning._registry.get_version("Intern", "1.0.0", exact=True) is Intern_1_0_0
+
+
+class TestPickling(ClassTest):
+    class_ = VersionedMeta
+
+    class PickleVersioning(VersionedClass):
+        _VERSION_TYPE = VersionType(name="Pickle", class_=TriNumberVersion)
+
+        @classmethod
+        def get_version_from_object(cls, obj):
+            return obj
+
+        def __init__(self, version):
+            self.value = str(version)
+
+    class Pickle_1_0_0(PickleVersioning):
+        VERSION = "1.0.0"
+
+    class Pickle_1_0_0_unregistered(PickleVersioning):
+        _registration = False
+        VERSION = "1.0.0"
+
+    def test_classes_pickle_by_version(self):
+        dynamic = type("Pickle_2_0_0", (self.PickleVersioning,), {"VERSION": "2.0.0"})
+        assert pickle.loads(pickle.dumps(dynamic)) is dynamic
+        assert pickle.loads(pickle.dumps(self.Pickle_1_0_0)) is self.Pickle_1_0_0
+        # After the first class, each class of the same head only adds its version key to the payload.
+        assert len(pickle.dumps([dynamic, self.Pickle_1_0_0])) - len(pickle.dumps([dynamic])) < 24
+
+        for class_ in (self.PickleVersioning, self.Pickle_1_0_0_unregistered):
+            assert reduce_versioned_class(class_) == class_.__qualname__
+            assert pickle.loads(pickle.dumps(class_)) is class_
+
+    def test_instances_pickle(self):
+        dynamic = type("Pickle_3_0_0", (self.PickleVersioning,), {"VERSION": "3.0.0"})
+        obj = self.PickleVersioning("3.1.0")
+        assert type(obj) is dynamic
+        loaded = pickle.loads(pickle.dumps(obj))
+        assert type(loaded) is dynamic and loaded.value == "3.1.0"
+
+    def test_dynamic_classes_cross_processes(self):
+        if "fork" not in multiprocessing.get_all_start_methods():
+            pytest.skip("needs the fork start method so the worker has the dynamic class registered")
+
+        type("Pickle_4_0_0", (self.PickleVersioning,), {"VERSION": "4.0.0"})
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("fork")) as executor:
+            result = executor.submit(describe_versioned, self.PickleVersioning("4.2.0")).result()
+        assert result == ("Pickle_4_0_0", "4.2.0")
+
+
+class TestSharedVersionIndex(ClassTest):
+    class_ = SharedVersionIndex
+
+    @staticmethod
+    def create_registry(*versions):
+        registry = VersionRegistry()
+        registry.add_items((TriNumberVersion(version) for version in versions), VersionType("Shared", TriNumberVersion))
+        return registry
+
+    def test_publish_and_find(self):
+        with self.class_(capacity=8) as index:
+            generation = index.publish([(1, 0), (1, 0, 0), (1, 5, 0), (2, 0, 0)])
+            assert generation == 2 and index.generation == 2
+            assert index.find((1, 7, 3)) == (1, 5, 0)
+            assert index.find((1, 7, 3), exact=True) is None
+            assert index.find((1, 5, 0), before=True) == (1, 0, 0)
+            assert index.find((1, 0, 0), before=True) == (1, 0)
+            assert index.find((1, 5, 0, 2)) == (1, 5, 0)
+            assert index.find((0, 1, 0)) is None
+            assert index.keys() == [(1, 0), (1, 0, 0), (1, 5, 0), (2, 0, 0)]
+
+            attached = pickle.loads(pickle.dumps(index))
+            assert attached.name == index.name and attached.find((9, 0, 0)) == (2, 0, 0)
+            attached.close()
+
+            with pytest.raises(ValueError):
+                index.publish([(1, i, 0) for i in range(9)])
+            index.invalidate()
+            with pytest.raises(ValueError):
+                index.find((1, 0, 0))
+
+    def test_stalled_publisher(self):
+        with self.class_(capacity=8) as index:
+            index.publish([(1, 0, 0)])
+            index.max_retries = 10
+            index._words[0] += 1  # A publisher which stopped while writing leaves the generation odd.
+            with pytest.raises(TimeoutError):
+                index.find((1, 0, 0))
+
+            registry = self.create_registry("1.0.0", "1.5.0")
+            registry.attach_shared_index("Shared", index)
+            assert registry.get_version("Shared", "1.7.0") == TriNumberVersion(1, 5, 0)
+            registry.unpublish_shared_index("Shared")
+
+    def test_reader_registry(self):
+        publisher = self.create_registry("1.0.0", "1.5.0")
+        index = publisher.publish_shared_index("Shared")
+        try:
+            reader = self.create_registry("1.0.0", "1.5.0", "1.8.0")
+            reader.attach_shared_index("Shared", index.name)
+            assert reader.is_shared_reader("Shared") and not publisher.is_shared_reader("Shared")
+            assert isinstance(reader["Shared"], SharedVersionRegistryEntry)
+            assert reader.get_version_cached("Shared", "1.9.0") == TriNumberVersion(1, 5, 0)
+
+            publisher.add_item(TriNumberVersion(1, 8, 0), "Shared")
+            assert index.keys()[-1] == (1, 8, 0)
+            assert reader.get_version_cached("Shared", "1.9.0") == TriNumberVersion(1, 8, 0)
+
+            # The reader only adds to its exact index and searches the versions the publisher has published.
+            reader.add_item(TriNumberVersion(1, 9, 0), "Shared")
+            assert reader.get_version("Shared", "1.9.5") == TriNumberVersion(1, 8, 0)
+            assert reader.get_version("Shared", "1.9.0", exact=True) == TriNumberVersion(1, 9, 0)
+            assert reader.get_latest_version("Shared") == TriNumberVersion(1, 9, 0)
+
+            with pytest.warns(RuntimeWarning):
+                publisher.add_items([TriNumberVersion(2, i, 0) for i in range(index.capacity)], "Shared")
+            assert reader.get_version("Shared", "1.9.5") == TriNumberVersion(1, 9, 0)
+
+            reader.unpublish_shared_index("Shared")
+            assert reader["Shared"]["keys"] == [(1, 0, 0), (1, 5, 0), (1, 8, 0), (1, 9, 0)]
+        finally:
+            publisher.unpublish_shared_index("Shared")
+
+    def test_forked_workers_see_updates(self):
+        if "fork" not in multiprocessing.get_all_start_methods():
+            pytest.skip("needs the fork start method so the worker inherits the published index")
+
+        publisher = self.create_registry("1.0.0", "1.5.0")
+        publisher.publish_shared_index("Shared")
+        context = multiprocessing.get_context("fork")
+        parent_connection, child_connection = context.Pipe()
+        worker = context.Process(target=read_shared_registry, args=(publisher, child_connection))
+        worker.start()
+        try:
+            assert parent_connection.recv() == ("SharedVersionRegistryEntry", "1.5.0")
+            assert parent_connection.recv() == "1.5.0"
+            publisher.add_item(TriNumberVersion(1, 8, 0), "Shared")
+            parent_connection.send(None)
+            assert parent_connection.recv() == "1.8.0"
+        finally:
+            worker.join(timeout=10)
+            if worker.is_alive():
+                worker.terminate()
+            publisher.unpublish_shared_index("Shared")
+
+
+class TestDispatchCache(ClassTest):
+    class_ = DispatchCache
+
+    def test_hits_and_invalidation(self):
+        class CacheVersioning(VersionedClass):
+            _registry = VersionRegistry()
+            _VERSION_TYPE = VersionType(name="Cache", class_=TriNumberVersion)
+
+        class Cache_1_0_0(CacheVersioning):
+            VERSION = "1.0.0"
+
+        cache = CacheVersioning._registry.dispatch_cache
+        assert CacheVersioning.get_version_class("1.2.0") is Cache_1_0_0
+        assert CacheVersioning.get_version_class("1.2.0") is Cache_1_0_0
+        assert cache.info().hits == 1
+        assert cache.info().misses == 1
+
+        class Cache_1_1_0(CacheVersioning):
+            VERSION = "1.1.0"
+
+        assert CacheVersioning.get_version_class("1.2.0") is Cache_1_1_0
+        assert cache.info().misses == 2
+
+    def test_lru_eviction(self):
+        cache = self.class_(maxsize=2)
+        for key in ("1.0.0", "1.1.0", "1.0.0", "1.2.0"):
+            cache.set(cache.create_key("Cache", key), key)
+        assert cache.create_key("Cache", "1.1.0") not in cache
+        assert cache.get(cache.create_key("Cache", "1.0.0")) == "1.0.0"
+        assert cache.create_key("Cache", ["1", "0"]) == ("Cache", ("1", "0"), False)
+
+
+class TestDispatchInstrumentation(ClassTest):
+    class_ = DispatchInstrumentation
+
+    class InstrumentedVersioning(VersionedClass):
+        _registry = VersionRegistry()
+        _VERSION_TYPE = VersionType(name="Instrumented", class_=TriNumberVersion)
+
+        @classmethod
+        def get_version_from_object(cls, obj):
+            if obj is None:
+                raise FileNotFoundError
+            return obj
+
+    class Instrumented_1_0_0(InstrumentedVersioning):
+        VERSION = "1.0.0"
+
+        def __init__(self, obj):
+            self.obj = obj
+
+    def test_disabled_by_default(self):
+        assert self.InstrumentedVersioning._registry.instrumentation is None
+        assert type(self.InstrumentedVersioning("1.2.0")) is self.Instrumented_1_0_0
+
+    def test_counters_timings_and_callbacks(self):
+        registry = self.InstrumentedVersioning._registry
+        registry.dispatch_cache.invalidate()
+        timings = []
+        instrumentation = registry.enable_instrumentation()
+        instrumentation.add_callback(lambda name, phase, duration: timings.append((name, phase)))
+        try:
+            assert self.InstrumentedVersioning("1.2.0").obj == "1.2.0"
+            assert self.InstrumentedVersioning("1.2.0").obj == "1.2.0"
+            assert type(self.InstrumentedVersioning(None)) is self.InstrumentedVersioning
+        finally:
+            assert registry.disable_instrumentation() is instrumentation
+
+        snapshot = instrumentation.snapshot()["Instrumented"]
+        assert snapshot["counters"] == {"dispatch": 3, "cache_miss": 1, "cache_hit": 1, "lookup": 1, "not_found": 1}
+        assert set(snapshot["timings"]) == {"dispatch", "detect", "cast", "search", "construct"}
+        assert snapshot["timings"]["dispatch"]["count"] == 3
+        assert snapshot["timings"]["construct"]["count"] == 3
+        assert snapshot["timings"]["cast"]["p99"] <= snapshot["timings"]["cast"]["maximum"]
+        assert timings.count(("Instrumented", "dispatch")) == 3
+
+        self.InstrumentedVersioning("1.2.0")
+        assert instrumentation.snapshot()["Instrumented"]["counters"]["dispatch"] == 3
+        instrumentation.reset()
+        assert instrumentation.snapshot() == {}
+
+    def test_instrumentation_is_per_registry(self, monkeypatch):
+        class UninstrumentedVersioning(VersionedClass):
+            _registry = VersionRegistry()
+            _VERSION_TYPE = VersionType(name="Uninstrumented", class_=TriNumberVersion)
+
+            @classmethod
+            def get_version_from_object(cls, obj):
+                return obj
+
+        class Uninstrumented_1_0_0(UninstrumentedVersioning):
+            VERSION = "1.0.0"
+
+        initialized = []
+        monkeypatch.setattr(self.Instrumented_1_0_0, "__init__", lambda self, obj: initialized.append(obj))
+        registry = self.InstrumentedVersioning._registry
+        instrumentation = registry.enable_instrumentation()
+        try:
+            assert "__call__" not in vars(VersionedMeta)
+            assert type(UninstrumentedVersioning("1.2.0")) is Uninstrumented_1_0_0
+            assert type(self.InstrumentedVersioning("1.2.0")) is self.Instrumented_1_0_0
+        finally:
+            registry.disable_instrumentation()
+
+        assert initialized == ["1.2.0"]
+        assert set(instrumentation.snapshot()) == {"Instrumented"}
+        assert instrumentation.snapshot()["Instrumented"]["timings"]["construct"]["count"] == 1
+
+    def test_histogram_percentiles(self):
+        histogram = TimingHistogram()
+        for duration in (100, 200, 300, 5000):
+            histogram.record(duration)
+        assert histogram.summary()["mean"] == 1400
+        assert histogram.percentile(50) == 255
+        assert histogram.percentile(100) == 5000
+        assert TimingHistogram().percentile(50) == 0
+
+
 # Main #
 if __name__ == '__main__':
     pytest.main(["-v", "-s"])